@@ -0,0 +1,56 @@
+"""Benchmark the sparse interpolation kernels against the scipy path.
+
+Usage:
+    python benchmarks/interpolation_kernels.py --n-source 1000000 --n-target 20000 --n-leading 96
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from mxalign.interpolations.kernels import get_kernel
+
+
+def random_weights(n_target, n_source, nnz_per_row=3, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = np.repeat(np.arange(n_target), nnz_per_row)
+    cols = rng.integers(0, n_source, n_target * nnz_per_row)
+    vals = rng.random(n_target * nnz_per_row)
+    return csr_matrix((vals, (rows, cols)), shape=(n_target, n_source))
+
+
+def timeit(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-source", type=int, default=1_000_000)
+    parser.add_argument("--n-target", type=int, default=20_000)
+    parser.add_argument("--n-leading", type=int, default=96)
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, os.cpu_count()])
+    args = parser.parse_args()
+
+    W = random_weights(args.n_target, args.n_source).astype(args.dtype)
+    data = np.random.default_rng(1).random((args.n_leading, args.n_source)).astype(args.dtype)
+
+    reference_time, reference = timeit(lambda: get_kernel("scipy")(data, W), args.repeat)
+    print(f"scipy                  {reference_time:8.3f} s")
+    threaded = get_kernel("threaded")
+    for n_threads in sorted(set(args.threads)):
+        elapsed, result = timeit(lambda: threaded(data, W, n_threads=n_threads), args.repeat)
+        ok = np.allclose(result, reference, rtol=1e-5)
+        print(f"threaded ({n_threads:3d} threads) {elapsed:8.3f} s  speed-up {reference_time / elapsed:5.2f}  {'ok' if ok else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from ..properties.properties import Space
 from ..properties.utils import properties_from_attrs, update_space_property
 
 from ..utils.projections import create_cartopy_crs, BUILTIN
+from ..interpolations.cache import fingerprint
 
 @xr.register_dataset_accessor("space")
 class SpaceAccessor:
@@ -19,6 +20,14 @@ class SpaceAccessor:
     def is_point(self):
         return self._space == Space.POINT
     
+    def fingerprint(self):
+        """Hash of the spatial coordinates, identical for datasets on the same grid/network."""
+        return fingerprint(
+            self._ds["latitude"].values,
+            self._ds["longitude"].values,
+            space=self._space.value
+        )
+
     def add_crs(self, crs):
         if self.is_point():
             raise ValueError("Cannot add CRS to a point dataset")
@@ -164,21 +173,89 @@ class SpaceAccessor:
         else:
             raise ValueError("Datasets do not have compatible spatial properties")
         
-def _align_grid_grid(ds1, ds2, **kwargs):
-    raise NotImplementedError("Regridding not implemented")
+def _align_grid_grid(ds1, ds2, interpolator=None, **kwargs):
+    if interpolator is None:
+        from ..interpolations.registry import get_interpolation
+        method = kwargs.pop("method", "bilinear")
+        interpolator = get_interpolation(method)(ds2, **kwargs)
+    ds1 = interpolator.interpolate(ds1.copy())
+
+    return ds1, ds2
 
-def _align_grid_point(ds1, ds2, **kwargs):
-    from ..interpolations.interpolate import interpolate
-    method = kwargs.pop("method", "xarray")
-    ds1 = interpolate(ds1, ds2, method, **kwargs)
+def _align_grid_point(ds1, ds2, interpolator=None, **kwargs):
+    if interpolator is None:
+        from ..interpolations.registry import get_interpolation
+        method = kwargs.pop("method", "xarray")
+        interpolator = get_interpolation(method)(ds2, **kwargs)
+    ds1 = interpolator.interpolate(ds1.copy())
     
     return ds1, ds2
 
-def _align_point_point(ds1, ds2, **kwargs):
-    raise NotImplementedError("Point selection not implemented")
+def _align_point_point(ds1, ds2, by=None, max_distance=1000.0, **kwargs):
+    """Select the points of ds1 matching the points of ds2.
+
+    Points are matched on ``code`` when both datasets have it (or ``by="code"``),
+    and otherwise (or ``by="location"``) to the nearest point within
+    ``max_distance`` metres. The selection is a single vectorized isel,
+    points of ds2 without a match are set to NaN.
+    """
+    if by is None:
+        by = "code" if ("code" in ds1.coords and "code" in ds2.coords) else "location"
+    if by == "code":
+        index, found = _match_codes(ds1["code"].values, ds2["code"].values)
+    elif by == "location":
+        index, found = _match_locations(ds1, ds2, max_distance)
+    else:
+        raise ValueError(f"Invalid value for by: {by}. Expected 'code' or 'location'.")
+
+    if ds1.sizes["point_index"] == 0:
+        # Nothing to select, pad a single missing point for the unmatched points
+        ds1 = ds1.pad(point_index=(0, 1))
+    ds1_aligned = ds1.isel(point_index=index)
+    if not found.all():
+        ds1_aligned = ds1_aligned.where(xr.DataArray(found, dims="point_index"))
+    point_coords = {c: ds2[c] for c in ds2.coords if ds2[c].dims == ("point_index",)}
+    ds1_aligned = ds1_aligned.assign_coords(point_coords)
 
-def _align_point_grid(ds1, ds2, **kwargs):
-    raise NotImplementedError("Gridding of Point datanot implemented")
+    return ds1_aligned, ds2
+
+def _match_codes(codes1, codes2):
+    """Positions in codes1 of every code in codes2, using a sorted search."""
+    if codes1.dtype.kind != codes2.dtype.kind:
+        codes1 = codes1.astype(str)
+        codes2 = codes2.astype(str)
+    if len(codes1) == 0:
+        return np.zeros(len(codes2), dtype=int), np.zeros(len(codes2), dtype=bool)
+    order = np.argsort(codes1, kind="stable")
+    sorted_codes = codes1[order]
+    pos = np.searchsorted(sorted_codes, codes2)
+    pos = np.minimum(pos, len(sorted_codes) - 1)
+    found = sorted_codes[pos] == codes2
+    return order[pos], found
+
+def _match_locations(ds1, ds2, max_distance):
+    """Positions in ds1 of the nearest point to every point of ds2, within max_distance (m)."""
+    from scipy.spatial import cKDTree
+    from ..interpolations.kdtree import lonlat_to_xyz, distance_to_chord
+
+    tree = cKDTree(lonlat_to_xyz(ds1["latitude"].values, ds1["longitude"].values))
+    upper_bound = np.inf if max_distance is None else distance_to_chord(max_distance)
+    chord, index = tree.query(
+        lonlat_to_xyz(ds2["latitude"].values, ds2["longitude"].values),
+        distance_upper_bound=upper_bound,
+        workers=-1
+    )
+    found = np.isfinite(chord)
+    return np.where(found, index, 0), found
+
+def _align_point_grid(ds1, ds2, interpolator=None, **kwargs):
+    if interpolator is None:
+        from ..interpolations.registry import get_interpolation
+        method = kwargs.pop("method", "binning")
+        interpolator = get_interpolation(method)(ds2, **kwargs)
+    ds1 = interpolator.interpolate(ds1.copy())
+
+    return ds1, ds2
 
 
 
@@ -1,13 +1,52 @@
+from dataclasses import dataclass
+
 import xarray as xr
 import numpy as np
 
 from ..properties.properties import Time
 from ..properties.utils import properties_from_attrs
+
+
+@dataclass(frozen=True)
+class ValidTimeIndex:
+    """Sorted, flat index of the valid times of a dataset.
+
+    ``valid_times`` holds all valid times in ascending order. For forecasts
+    ``reference_index`` and ``lead_index`` are the positions along
+    reference_time and lead_time they come from, with equal valid times
+    ordered by lead time, shortest first. For observations ``time_index`` is
+    the position along valid_time.
+    """
+
+    valid_times: np.ndarray
+    reference_index: np.ndarray | None = None
+    lead_index: np.ndarray | None = None
+    time_index: np.ndarray | None = None
+
+    def lookup(self, times):
+        """Position of each of ``times`` in ``valid_times`` (-1 if not present), by binary search."""
+        times = np.asarray(times, dtype=self.valid_times.dtype)
+        pos = np.searchsorted(self.valid_times, times)
+        pos_clipped = np.minimum(pos, len(self.valid_times) - 1)
+        found = (pos < len(self.valid_times)) & (self.valid_times[pos_clipped] == times)
+        return np.where(found, pos_clipped, -1)
+
+    def contains(self, times):
+        return self.lookup(times) >= 0
+
+    def intersection(self, times):
+        """Sorted valid times that are also in ``times``."""
+        return np.unique(np.asarray(times)[self.contains(times)])
+
+
 @xr.register_dataset_accessor("time")
 class TimeAccessor:
     def __init__(self, ds):
         self._time = properties_from_attrs(ds).time
         self._ds = ds
+        # xarray keeps one accessor per dataset object, so these are computed once
+        self._valid_time_index = None
+        self._ds_valid_time = None
 
     def is_forecast(self):
         return self._time == Time.FORECAST
@@ -16,16 +55,40 @@ class TimeAccessor:
         return self._time == Time.OBSERVATION
 
     def add_valid_time(self):
-        if self.is_forecast():          
+        if not self.is_forecast():
+            return self._ds
+        if self._ds_valid_time is None:
             valid_time = self._ds["reference_time"].values[:,np.newaxis] + self._ds["lead_time"].values
-            ds_out = self._ds.assign_coords(
+            self._ds_valid_time = self._ds.assign_coords(
                 {
                     "valid_time": (["reference_time", "lead_time"], valid_time)
                 }
             )
-        else:
-            ds_out = self._ds
-        return ds_out
+        return self._ds_valid_time
+
+    def valid_time_index(self):
+        """Cached ValidTimeIndex of the dataset.
+
+        For forecasts the (reference_time, lead_time) valid times are flattened
+        and sorted once, so lookups and intersections are binary searches.
+        """
+        if self._valid_time_index is None:
+            if self.is_forecast():
+                reference_times = self._ds["reference_time"].values
+                lead_times = self._ds["lead_time"].values
+                valid_times = (reference_times[:, np.newaxis] + lead_times).ravel()
+                flat_lead = np.tile(np.arange(len(lead_times)), len(reference_times))
+                order = np.lexsort((lead_times[flat_lead], valid_times))
+                self._valid_time_index = ValidTimeIndex(
+                    valid_times=valid_times[order],
+                    reference_index=order // len(lead_times),
+                    lead_index=order % len(lead_times),
+                )
+            else:
+                valid_times = self._ds["valid_time"].values
+                order = np.argsort(valid_times, kind="stable")
+                self._valid_time_index = ValidTimeIndex(valid_times=valid_times[order], time_index=order)
+        return self._valid_time_index
     
     def align_with(self, ds, **kwargs):
         if self.is_forecast():
@@ -42,93 +105,129 @@ class TimeAccessor:
             raise ValueError("Datasets do not have compatible temporal properties")
 
 def _align_forecast_forecast(ds1, ds2, only_common=False):
-    # Align the reference times
-    common_reference_times = ds1.indexes["reference_time"].intersection(ds2.indexes["reference_time"])
-    ds1_aligned = ds1.sel(reference_time=common_reference_times)
-    ds2_aligned = ds2.sel(reference_time=common_reference_times)
-    
-    # Align the lead times
-    if only_common:
-        common_lead_times = ds1_aligned.indexes["lead_time"].intersection(ds2_aligned.indexes["lead_time"])
-        ds1_aligned = ds1_aligned.sel(lead_time=common_lead_times)
-        ds2_aligned = ds2_aligned.sel(lead_time=common_lead_times)
-    else:
-        non_aligning_coords = (set(ds1.coords) | set(ds2.coords)) - set(["lead_time"])
-        ds1_aligned, ds2_aligned = xr.align(ds1_aligned, ds2_aligned, join="outer", exclude=non_aligning_coords)
-        ds1_aligned = ds1_aligned.time.add_valid_time()
-        ds2_aligned = ds2_aligned.time.add_valid_time()
-    return ds1_aligned, ds2_aligned
+    """Align two forecasts on their common reference times and the union (intersection if ``only_common``) of their lead times.
+
+    The common coordinates are computed with numpy set operations and every
+    forecast is reindexed once.
+    """
+    reference_times = np.intersect1d(ds1["reference_time"].values, ds2["reference_time"].values)
+    combine = np.intersect1d if only_common else np.union1d
+    lead_times = combine(ds1["lead_time"].values, ds2["lead_time"].values)
+    return (
+        _reindex_forecast(ds1, reference_times, lead_times),
+        _reindex_forecast(ds2, reference_times, lead_times),
+    )
+
+def _reindex_forecast(ds, reference_times, lead_times):
+    ds = ds.drop_vars("valid_time", errors="ignore").reindex(reference_time=reference_times, lead_time=lead_times)
+    return ds.time.add_valid_time()
 
 def _align_forecast_observation(ds_forecast, ds_observation, only_common=False,lead_time="start-min"):
-    ds_forecast = ds_forecast.time.add_valid_time()
+    """Align a forecast with an observation on valid_time, using coordinate indices only.
+
+    The (reference_time, lead_time) positions to keep are computed in numpy on
+    the coordinates and applied with a single vectorized isel, so the data
+    stays lazy and no dense masks over the dataset are evaluated. The result
+    has a sorted valid_time dimension, with reference_time and lead_time as
+    coordinates along it. If several forecasts are valid at the same time,
+    the one with the shortest lead time is kept.
+    """
+    reference_times = ds_forecast["reference_time"].values
+    lead_times = ds_forecast["lead_time"].values
+    index = ds_forecast.time.valid_time_index()
 
     # Check if reference_times are continuous
-    reference_time_diff = ds_forecast.reference_time.diff("reference_time").values
-    if not (reference_time_diff[0] == reference_time_diff).all():
+    reference_time_diff = np.diff(reference_times)
+    if len(reference_time_diff) and not (reference_time_diff[0] == reference_time_diff).all():
         raise NotImplementedError("Aligning a forecast with non-continuous reference times with an observation is not implemented.")
     if lead_time == "start-min":
-        min_diff = reference_time_diff[0]
-        ds_forecast_reduced = ds_forecast.where(ds_forecast.lead_time < min_diff, drop=True)
-    elif lead_time == "start-max":    
-        max_diff = ds_forecast.lead_time.max().values
-        reference_times = np.arange(ds_forecast.reference_time.min().values, ds_forecast.reference_time.max().values, max_diff, dtype="datetime64[ns]")
-        ds_forecast_reduced = ds_forecast.sel(reference_time=reference_times)
+        if len(reference_time_diff):
+            keep = lead_times[index.lead_index] < reference_time_diff[0]
+        else:
+            keep = np.ones(len(index.valid_times), dtype=bool)
+    elif lead_time == "start-max":
+        max_diff = lead_times.max()
+        selected = np.arange(reference_times.min(), reference_times.max(), max_diff, dtype="datetime64[ns]")
+        reference_index = ds_forecast.indexes["reference_time"].get_indexer(selected)
+        if (reference_index < 0).any():
+            raise KeyError(f"Reference times {selected[reference_index < 0]} not found in the forecast")
+        keep = np.isin(index.reference_index, reference_index)
     else:
         raise ValueError("Invalid value for lead_time. Expected 'start-min' or 'start-max'.")
-    
-    ds_forecast_stacked = ds_forecast_reduced.\
-        stack(time=["reference_time", "lead_time"]).\
-        reset_index("time").\
-        swap_dims({"time": "valid_time"}).transpose("valid_time",...)
+
+    # The index is sorted on valid time with the shortest lead time first,
+    # so keeping the first of equal valid times keeps the shortest lead time
+    valid_times = index.valid_times[keep]
+    flat_reference = index.reference_index[keep]
+    flat_lead = index.lead_index[keep]
+    unique = np.concatenate(([True], valid_times[1:] != valid_times[:-1]))
+    valid_times = valid_times[unique]
+    flat_reference = flat_reference[unique]
+    flat_lead = flat_lead[unique]
+
+    observation_index = ds_observation.time.valid_time_index()
     if only_common:
-        ds_forecast_aligned, ds_observation_aligned = xr.align(
-            ds_forecast_stacked, 
-            ds_observation, 
-            join="inner", 
-            exclude=set(ds_forecast_stacked.coords) | set(ds_observation.coords) - set(["valid_time"]))
+        pos = observation_index.lookup(valid_times)
+        found = pos >= 0
+        valid_times = valid_times[found]
+        flat_reference = flat_reference[found]
+        flat_lead = flat_lead[found]
+        ds_observation_aligned = ds_observation.isel(valid_time=observation_index.time_index[pos[found]])
     else:
-        ds_forecast_aligned, ds_observation_aligned = xr.align(
-            ds_forecast_stacked, 
-            ds_observation, 
-            join="outer", 
-            exclude=set(ds_forecast_stacked.coords) | set(ds_observation.coords) - set(["valid_time"]))
+        ds_observation_aligned = ds_observation
+
+    ds_forecast_aligned = ds_forecast.drop_vars("valid_time", errors="ignore").isel(
+        reference_time=xr.DataArray(flat_reference, dims="valid_time"),
+        lead_time=xr.DataArray(flat_lead, dims="valid_time"),
+    ).assign_coords(valid_time=valid_times).transpose("valid_time", ...)
+
+    if not only_common:
+        observation_times = ds_observation["valid_time"].values
+        union_times = np.union1d(valid_times, observation_index.valid_times)
+        if len(union_times) != len(valid_times):
+            ds_forecast_aligned = ds_forecast_aligned.reindex(valid_time=union_times)
+        if len(union_times) != len(observation_times) or (union_times != observation_times).any():
+            ds_observation_aligned = ds_observation.reindex(valid_time=union_times)
     return ds_forecast_aligned, ds_observation_aligned
 
 def _align_observation_observation(ds1, ds2, only_common=False):
+    """Align two observations on the intersection (if ``only_common``) or union of their valid times, using their ValidTimeIndex."""
+    index1 = ds1.time.valid_time_index()
+    index2 = ds2.time.valid_time_index()
     if only_common:
-        ds1_aligned, ds2_aligned = xr.align(ds1, ds2, join="inner", exclude=(set(ds1.coords) | set(ds2.coords)) - set(["valid_time"]))
-    else:
-        ds1_aligned, ds2_aligned = xr.align(ds1, ds2, join="outer", exclude=(set(ds1.coords) | set(ds2.coords)) - set(["valid_time"]))
-    return ds1_aligned, ds2_aligned
-
-def _align_observation_forecast(ds_observation, ds_forecast, only_common=False):
-    ds_forecast_cut = ds_forecast.time.add_valid_time()
-    if ds_forecast_cut.reference_time.min().values < ds_observation.valid_time.min().values:
-        ds_forecast_cut = ds_forecast_cut.sel(
-            reference_time=slice(
-                ds_observation.valid_time.min().values, None)
+        valid_times = index1.intersection(index2.valid_times)
+        return (
+            ds1.isel(valid_time=index1.time_index[index1.lookup(valid_times)]),
+            ds2.isel(valid_time=index2.time_index[index2.lookup(valid_times)]),
         )
-    if ds_forecast_cut.valid_time.max().values > ds_observation.valid_time.max().values:
-        # The forecast time-step/lead times might not always align with the maximum observation time
-        valid_diff = (ds_forecast_cut["valid_time"]-(ds_observation["valid_time"].max())).isel(lead_time=-1)
-        last_valid_index = np.abs(valid_diff.where(valid_diff<=0, drop=True)).argmin().values
-        max_reference_time = ds_forecast_cut.isel(reference_time=last_valid_index)["reference_time"].values
+    valid_times = np.union1d(index1.valid_times, index2.valid_times)
+    return ds1.reindex(valid_time=valid_times), ds2.reindex(valid_time=valid_times)
 
+def _align_observation_forecast(ds_observation, ds_forecast, only_common=False):
+    ds_forecast = ds_forecast.time.add_valid_time()
+    observation_index = ds_observation.time.valid_time_index()
+    first_time, last_time = observation_index.valid_times[0], observation_index.valid_times[-1]
 
-        #max_reference_time = ds_observation.valid_time.max().values - (ds_forecast_cut.lead_time.max().values - shift)
-        ds_forecast_cut = ds_forecast_cut.sel(reference_time=slice(None, max_reference_time))
+    # Keep the reference times whose forecasts lie within the observed period.
+    # The forecast time-step/lead times might not always align with the
+    # maximum observation time
+    reference_times = ds_forecast["reference_time"].values
+    lead_times = ds_forecast["lead_time"].values
+    keep = (reference_times >= first_time) & (reference_times + lead_times[-1] <= last_time)
+    ds_forecast_cut = ds_forecast.isel(reference_time=np.flatnonzero(keep))
 
-    ds_observation_aligned = ds_observation.sel(valid_time=ds_forecast_cut.valid_time)
+    valid_time = ds_forecast_cut["valid_time"]
+    pos = observation_index.lookup(valid_time.values)
+    if (pos < 0).any():
+        raise KeyError(f"Valid times {np.unique(valid_time.values[pos < 0])} not found in the observation")
+    ds_observation_aligned = ds_observation.isel(
+        valid_time=xr.DataArray(observation_index.time_index[pos], dims=valid_time.dims)
+    ).assign_coords(valid_time=valid_time)
     ds_observation_aligned = ds_observation_aligned.transpose("reference_time", "lead_time", ...)
     if only_common:
         return ds_observation_aligned, ds_forecast_cut
     else:
-        ds_observation_aligned, ds_forecast_aligned = xr.align(
-            ds_observation_aligned, 
-            ds_forecast.time.add_valid_time(), 
-            join="outer", 
-            exclude=(set(ds_observation_aligned.coords) | set(ds_forecast_cut.coords)) - set(["reference_time", "lead_time"]))
-        ds_observation_aligned["valid_time"] = ds_forecast_aligned["valid_time"]
-        return ds_observation_aligned, ds_forecast_aligned
-
-
+        # The cut reference times are a subset of the forecast's
+        ds_observation_aligned = ds_observation_aligned.reindex(reference_time=reference_times)
+        ds_observation_aligned["valid_time"] = ds_forecast["valid_time"]
+        return ds_observation_aligned, ds_forecast
@@ -0,0 +1,288 @@
+import os
+import shutil
+
+import numpy as np
+import xarray as xr
+
+_ACCUMULATORS = {}
+
+STATISTIC_DIM = "statistic"
+
+# Number of time steps per batch when streaming over a dimension that is not chunked
+DEFAULT_BATCH_SIZE = 24
+
+
+def register_accumulator(cls):
+    for name in (cls.name, *cls.aliases):
+        _ACCUMULATORS[name] = cls
+    return cls
+
+def available_accumulators():
+    return list(_ACCUMULATORS.keys())
+
+def get_accumulator(name):
+    try:
+        return _ACCUMULATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown accumulator: {name}")
+
+
+class Accumulator():
+    """Verification metric computed from sums that can be accumulated.
+
+    ``accumulate`` reduces a forecast and reference to partial sums over
+    ``dim``, stacked along a ``statistic`` dimension. Partial sums of disjoint
+    samples (e.g. different reference times) can be added, and ``finalize``
+    turns the total into the metric. Only pairs where both forecast and
+    reference are defined are counted. The sums are accumulated in float64.
+
+    ``stream`` computes the sums batch by batch along a time dimension, so
+    the memory only depends on the dimensions that are not reduced.
+
+    Only the options in ``parameters`` are accepted. Missing values are
+    always skipped, as with ``skipna=True`` in xskillscore. Other options
+    (e.g. ``weights``) would be ignored, so they raise a ValueError.
+
+    ``aliases`` are other names of the accumulator, e.g. the name of the
+    xskillscore function it replaces. ``arguments`` are the names of the
+    arguments of that function that correspond to the forecast and reference
+    inputs, see ``reference_first``.
+    """
+
+    name = None
+    aliases = ()
+    arguments = ("a", "b")
+    parameters = ()
+
+    def __init__(self, **kwargs):
+        if kwargs.pop("skipna", True) is not True:
+            raise ValueError(f"Accumulator {self.name} always skips missing values, skipna=False is not supported")
+        unsupported = [key for key in kwargs if key not in self.parameters]
+        if unsupported:
+            raise ValueError(f"Accumulator {self.name} does not support the options {unsupported}")
+        self.options = kwargs
+
+    def reference_first(self, inputs):
+        """Whether the reference is passed as the first input, given the ``inputs`` of the metric function.
+
+        The inputs map argument names to "reference" or a predictor. If they
+        name the ``arguments`` of the accumulator, the first of those decides,
+        otherwise the first input in the configuration.
+        """
+        if not inputs:
+            return False
+        if all(argument in inputs for argument in self.arguments):
+            return inputs[self.arguments[0]] == "reference"
+        return list(inputs.values())[0] == "reference"
+
+    def terms(self, forecast, reference):
+        """Element-wise terms to sum, besides the count."""
+        raise NotImplementedError
+
+    def finalize(self, sums):
+        raise NotImplementedError
+
+    def valid(self, forecast, reference):
+        """Mask of the samples that are counted."""
+        return (forecast - reference).notnull()
+
+    def accumulate(self, forecast, reference, dim=None):
+        valid = self.valid(forecast, reference)
+        forecast = forecast.where(valid)
+        reference = reference.where(valid)
+        terms = self.terms(forecast, reference)
+        terms["count"] = valid
+        if dim is not None:
+            # Terms can have fewer dimensions than the inputs (e.g. no ensemble member)
+            dims = set().union(*(term.dims for term in terms.values()))
+            dim = [d for d in ([dim] if isinstance(dim, str) else dim) if d in dims]
+        sums = [term.sum(dim, dtype=np.float64) for term in terms.values()]
+        return xr.concat(sums, dim=xr.Variable(STATISTIC_DIM, list(terms.keys())))
+
+    def stream(self, forecast, reference, dim=None, over="reference_time", batch_size=None, checkpoint=None):
+        """Partial sums over ``dim``, computed batch by batch along ``over``.
+
+        Every batch of ``batch_size`` elements along ``over`` (by default the
+        chunks of the forecast, or DEFAULT_BATCH_SIZE elements if it is not
+        chunked along ``over``) is computed and, if ``over`` is reduced, added
+        to the running sums. With ``checkpoint`` the running sums are written
+        to that zarr store after every batch, an interrupted run resumes after
+        the last batch written. The checkpoint is removed once done.
+        """
+        dim = [dim] if isinstance(dim, str) else dim
+        reduce_over = dim is None or over in dim
+        if dim is None:
+            partial_dim = [d for d in forecast.dims if d != over]
+        else:
+            partial_dim = [d for d in dim if d != over]
+
+        values = forecast[over].values
+        chunks = forecast.chunksizes.get(over, None) if batch_size is None else None
+        if batch_size is None and chunks is None:
+            batch_size = DEFAULT_BATCH_SIZE
+            print(f"No batch_size given and {over} is not chunked, streaming in batches of {batch_size}")
+        if chunks is not None:
+            bounds = np.cumsum(chunks)
+        else:
+            bounds = np.append(np.arange(batch_size, len(values), batch_size), len(values))
+        state, start = _load_checkpoint(checkpoint, values)
+
+        for stop in bounds[bounds > start]:
+            batch = {over: slice(start, stop)}
+            sums = self.accumulate(forecast.isel(batch), reference.isel(batch), dim=partial_dim)
+            if reduce_over:
+                sums = sums.sum(over)
+            sums = sums.compute()
+            if state is None:
+                state = sums
+            elif reduce_over:
+                state = state + sums
+            else:
+                state = xr.concat([state, sums], dim=over)
+            start = stop
+            if checkpoint is not None:
+                _save_checkpoint(checkpoint, state, start, values[start - 1])
+
+        if state is None:
+            # Nothing to stream over, e.g. no new reference times
+            state = self.accumulate(forecast, reference, dim=dim if reduce_over else partial_dim).compute()
+        if checkpoint is not None and os.path.exists(checkpoint):
+            shutil.rmtree(checkpoint)
+        state.attrs = {}
+        return state
+
+    @staticmethod
+    def _get(sums, statistic):
+        return sums.sel({STATISTIC_DIM: statistic}, drop=True)
+
+    def _mean(self, sums, statistic):
+        count = self._get(sums, "count")
+        return self._get(sums, statistic) / count.where(count > 0)
+
+
+@register_accumulator
+class MSE(Accumulator):
+    """Mean squared error."""
+
+    name = "mse"
+
+    def terms(self, forecast, reference):
+        return {"sum_squared_error": (forecast - reference) ** 2}
+
+    def finalize(self, sums):
+        return self._mean(sums, "sum_squared_error")
+
+
+@register_accumulator
+class RMSE(MSE):
+    """Root mean squared error."""
+
+    name = "rmse"
+
+    def finalize(self, sums):
+        return np.sqrt(super().finalize(sums))
+
+
+@register_accumulator
+class MAE(Accumulator):
+    """Mean absolute error."""
+
+    name = "mae"
+
+    def terms(self, forecast, reference):
+        return {"sum_absolute_error": abs(forecast - reference)}
+
+    def finalize(self, sums):
+        return self._mean(sums, "sum_absolute_error")
+
+
+@register_accumulator
+class Bias(Accumulator):
+    """Mean error, forecast minus reference."""
+
+    name = "bias"
+    aliases = ("me",)
+
+    def terms(self, forecast, reference):
+        return {"sum_error": forecast - reference}
+
+    def finalize(self, sums):
+        return self._mean(sums, "sum_error")
+
+
+@register_accumulator
+class Pearson(Accumulator):
+    """Pearson correlation, from the running sums and co-moments of forecast and reference."""
+
+    name = "pearson_r"
+
+    def terms(self, forecast, reference):
+        return {
+            "sum_forecast": forecast,
+            "sum_reference": reference,
+            "sum_forecast_squared": forecast ** 2,
+            "sum_reference_squared": reference ** 2,
+            "sum_product": forecast * reference,
+        }
+
+    def finalize(self, sums):
+        mean_forecast = self._mean(sums, "sum_forecast")
+        mean_reference = self._mean(sums, "sum_reference")
+        covariance = self._mean(sums, "sum_product") - mean_forecast * mean_reference
+        variance_forecast = self._mean(sums, "sum_forecast_squared") - mean_forecast ** 2
+        variance_reference = self._mean(sums, "sum_reference_squared") - mean_reference ** 2
+        return covariance / np.sqrt(variance_forecast * variance_reference)
+
+
+@register_accumulator
+class CRPS(Accumulator):
+    """Continuous ranked probability score of an ensemble forecast.
+
+    Uses the ensemble estimator E|X - y| - E|X - X'| / 2, with the members
+    along ``member_dim`` (default "member"). Samples are only counted if all
+    members are defined.
+    """
+
+    name = "crps"
+    aliases = ("crps_ensemble",)
+    arguments = ("forecasts", "observations")
+    parameters = ("member_dim",)
+
+    def valid(self, forecast, reference):
+        return super().valid(forecast, reference).all(self.options.get("member_dim", "member"))
+
+    def terms(self, forecast, reference):
+        member_dim = self.options.get("member_dim", "member")
+        n_members = forecast.sizes[member_dim]
+        skill = abs(forecast - reference).mean(member_dim)
+        # E|X - X'| = 2 / m^2 sum_i (2i - m - 1) x_(i), with x_(i) the sorted members
+        weights = xr.DataArray(2 * np.arange(1, n_members + 1) - n_members - 1, dims=member_dim)
+        if forecast.chunks:
+            forecast = forecast.chunk({member_dim: -1})
+        ranked = xr.apply_ufunc(
+            np.sort, forecast,
+            input_core_dims=[[member_dim]],
+            output_core_dims=[[member_dim]],
+            dask="parallelized",
+            kwargs={"axis": -1},
+        )
+        spread = 2 * (ranked * weights).sum(member_dim) / n_members ** 2
+        return {"sum_crps": skill - spread / 2}
+
+    def finalize(self, sums):
+        return self._mean(sums, "sum_crps")
+
+
+def _save_checkpoint(checkpoint, state, position, last):
+    state.assign_attrs(position=int(position), last=str(last)).to_zarr(checkpoint, mode="w")
+
+def _load_checkpoint(checkpoint, values):
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return None, 0
+    state = xr.open_zarr(checkpoint).load()
+    position = state.attrs.get("position", 0)
+    if not 0 < position <= len(values) or str(values[position - 1]) != state.attrs.get("last", None):
+        print(f"Checkpoint {checkpoint} does not match the data, starting over")
+        return None, 0
+    print(f"Resuming from checkpoint {checkpoint} after {position} time steps")
+    return state, position
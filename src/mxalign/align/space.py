@@ -2,26 +2,58 @@ import xarray as xr
 
 from ..properties.properties import Properties, Time, Space, Uncertainty
 from ..properties.utils import properties_to_attrs
+from ..interpolations.registry import get_interpolation
 
 def align_space(datasets, reference, **kwargs):
     if isinstance(datasets, (xr.Dataset, xr.DataArray)):
         datasets = [datasets]
     if isinstance(datasets, dict):
-        keys = datasets.keys()
-        datasets = datasets.items()
+        keys = list(datasets.keys())
+        datasets = list(datasets.values())
     else:
         keys = None
 
-    datasets = [
-        ds.space.align_with(reference, **kwargs)[0]
-        for ds in datasets
-    ]
+    # Datasets on the same source grid share one interpolator (and its weights)
+    aligned = [None] * len(datasets)
+    for group in plan_space_alignment(datasets, reference):
+        options = kwargs.copy()
+        interpolator = _shared_interpolator(datasets[group[0]], reference, options)
+        if interpolator is not None:
+            options = {"interpolator": interpolator}
+        for i in group:
+            aligned[i] = datasets[i].space.align_with(reference, **options)[0]
 
     if keys is None:
-        if len(datasets)==1 :
-            return datasets[0]
+        if len(aligned)==1 :
+            return aligned[0]
         else:
-            return datasets
+            return aligned
     else:
-        return {key: value for (key, value) in zip(keys, datasets)}
-        
+        return {key: value for (key, value) in zip(keys, aligned)}
+
+def plan_space_alignment(datasets, reference):
+    """Group datasets that can share a spatial-alignment operator.
+
+    Datasets are grouped by the fingerprint of their spatial coordinates,
+    i.e. per source grid or station network.
+
+    Returns:
+        list[list[int]]: Positions of the datasets in each group.
+    """
+    groups = {}
+    for i, ds in enumerate(datasets):
+        key = ds.space.fingerprint()
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+def _shared_interpolator(ds, reference, options):
+    if ds.space.is_grid() and reference.space.is_point():
+        method = options.pop("method", "xarray")
+        return get_interpolation(method)(reference, **options)
+    if ds.space.is_grid() and reference.space.is_grid():
+        method = options.pop("method", "bilinear")
+        return get_interpolation(method)(reference, **options)
+    if ds.space.is_point() and reference.space.is_grid():
+        method = options.pop("method", "binning")
+        return get_interpolation(method)(reference, **options)
+    return None
@@ -1,61 +1,80 @@
+from functools import reduce
+
 import xarray as xr
 import numpy as np
 
 from ..properties.properties import Properties, Time, Space, Uncertainty
 from ..properties.utils import properties_to_attrs
 
-def align_time(datasets: list[xr.Dataset] | dict[str, xr.Dataset], return_as: str = "forecast"):
+def align_time(datasets: list[xr.Dataset] | dict[str, xr.Dataset], return_as: str = "forecast", only_common: bool = False):
+    """Align the time axes of any number of datasets in a single pass.
+
+    Forecasts are aligned on the reference times they all share and on the
+    union of their lead times (the intersection if ``only_common``).
+    Observations are mapped onto the valid times of the resulting
+    (reference_time, lead_time) grid, with NaN where they have no data. If
+    ``only_common``, only reference times whose forecasts lie within the
+    period of every observation are kept. Without forecasts, observations are
+    aligned on the union (or intersection) of their valid times.
+
+    The common time coordinates are computed once with numpy set operations
+    and every dataset is reindexed once.
+    """
     if isinstance(datasets, (xr.Dataset, xr.DataArray)):
         datasets = [datasets]
     if isinstance(datasets, dict):
-        keys = datasets.keys()
-        datasets = datasets.values()
+        keys = list(datasets.keys())
+        datasets = list(datasets.values())
     else:
         keys = None
 
     if return_as != "forecast":
-        NotImplementedError("Currently only temporal alignment return forecast structure is supported.")
-
-    # Get the first forecast to start building the valid times
-    valid_times_fcst = None
-    valid_times_obs = None
-    first_fcst = True
-    first_obs = True
-    for ds in datasets:
-        if ds.time.is_forecast():
-            if first_fcst:
-                valid_times_fcst = ds.time.add_valid_time()["valid_time"].to_dataset(name="valid_times")
-                valid_times_fcst = valid_times_fcst.assign_attrs(ds.attrs)
-                first_fcst = False
-            else:
-                _ds = ds.time.add_valid_time()["valid_time"].to_dataset(name="valid_times")
-                _ds = _ds.assign_attrs(ds.attrs)
-                _, valid_times_fcst = _ds.time.align_with(valid_times_fcst)
-        elif ds.time.is_observation():
-            if first_obs:
-                valid_times_obs = ds["valid_time"].to_dataset(name="valid_times")
-                valid_times_obs = valid_times_obs.assign_attrs(ds.attrs)
-                fist_obs = False
-            else:
-                _ds = ds["valid_time"].to_dataset(name="valid_times")
-                _ds = _ds.assign_attrs(ds.attrs)
-                _, valid_times_obs = _ds.time.align_with(valid_times_obs)
-
-    if (valid_times_obs is None) and (valid_times_fcst is None):
+        raise NotImplementedError("Currently only temporal alignment return forecast structure is supported.")
+
+    forecasts = [ds for ds in datasets if ds.time.is_forecast()]
+    observations = [ds for ds in datasets if ds.time.is_observation()]
+    if len(forecasts) + len(observations) < len(datasets):
+        raise ValueError("Datasets do not have compatible temporal properties")
+    if not datasets:
         raise ValueError("No observations or forecasts found")
-    elif valid_times_fcst is None:
-        valid_times = valid_times_obs
-    elif valid_times_obs is None:
-        valid_times = valid_times_fcst
-    else:
-        _, valid_times = valid_times_obs.time.align_with(valid_times_fcst)
-    
-    datasets = [
-        ds.time.align_with(valid_times)[0]
-        for ds in datasets
+
+    combine = np.intersect1d if only_common else np.union1d
+    if forecasts:
+        reference_times = reduce(np.intersect1d, [ds["reference_time"].values for ds in forecasts])
+        lead_times = reduce(combine, [ds["lead_time"].values for ds in forecasts])
+        if only_common and observations and len(lead_times):
+            indexes = [ds.time.valid_time_index() for ds in observations]
+            first_time = max(index.valid_times[0] for index in indexes)
+            last_time = min(index.valid_times[-1] for index in indexes)
+            keep = (reference_times >= first_time) & (reference_times + lead_times[-1] <= last_time)
+            reference_times = reference_times[keep]
+        datasets = [
+            _reindex_forecast(ds, reference_times, lead_times)
+            if ds.time.is_forecast()
+            else _map_observation(ds, reference_times, lead_times)
+            for ds in datasets
         ]
+    else:
+        valid_times = reduce(combine, [ds.time.valid_time_index().valid_times for ds in observations])
+        datasets = [ds.reindex(valid_time=valid_times) for ds in datasets]
+
     if keys is None:
         return datasets
     else:
         return {key: value for (key, value) in zip(keys, datasets)}
-    
+
+def _reindex_forecast(ds, reference_times, lead_times):
+    ds = ds.drop_vars("valid_time", errors="ignore").reindex(reference_time=reference_times, lead_time=lead_times)
+    return ds.time.add_valid_time()
+
+def _map_observation(ds, reference_times, lead_times):
+    """Map an observation onto (reference_time, lead_time) with one reindex and one 2-D isel."""
+    valid_time = reference_times[:, np.newaxis] + lead_times
+    needed_times = np.unique(valid_time)
+    ds = ds.reindex(valid_time=needed_times)
+    positions = xr.DataArray(
+        np.searchsorted(needed_times, valid_time),
+        dims=("reference_time", "lead_time"),
+        coords={"reference_time": reference_times, "lead_time": lead_times},
+    )
+    return ds.isel(valid_time=positions).transpose("reference_time", "lead_time", ...)
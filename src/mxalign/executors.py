@@ -0,0 +1,150 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .verification import Metric
+
+_EXECUTORS = {}
+
+
+def register_executor(name):
+    def decorator(cls):
+        _EXECUTORS[name] = cls
+        return cls
+    return decorator
+
+def available_executors():
+    return list(_EXECUTORS.keys())
+
+def get_executor(name):
+    try:
+        return _EXECUTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown verification executor: {name}")
+
+
+class Executor():
+    """Runs the (metric, model) verification tasks.
+
+    ``run`` takes a dict of ``key: (metric, ds, kwargs)`` tasks and returns a
+    dict of ``key: metric.compute(ds, **kwargs)``.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+
+    def run(self, tasks):
+        raise NotImplementedError
+
+
+@register_executor("lazy")
+class LazyExecutor(Executor):
+    """Builds every (metric, model) result separately and leaves them lazy."""
+
+    def run(self, tasks):
+        return {key: metric.compute(ds, **kwargs) for key, (metric, ds, kwargs) in tasks.items()}
+
+
+@register_executor("fused")
+class FusedExecutor(Executor):
+    """Computes all (metric, model) pairs in one dask graph.
+
+    The inputs are rechunked once per set of reduction dimensions and shared
+    by all metrics, and all results are computed with a single dask.compute,
+    so every chunk is read from storage once instead of once per metric.
+    """
+
+    def run(self, tasks):
+        import dask
+
+        rechunked = {}
+        results = {}
+        for key, (metric, ds, kwargs) in tasks.items():
+            if isinstance(metric, Metric):
+                kwargs = {**kwargs, "rechunked": rechunked}
+            results[key] = metric.compute(ds, **kwargs)
+        print(f"Computing {len(results)} verification results")
+        (results,) = dask.compute(results, **self.options)
+        return results
+
+
+@register_executor("serial")
+class SerialExecutor(Executor):
+    """Computes the (metric, model) results one after the other."""
+
+    def run(self, tasks):
+        scheduler = self.options.get("scheduler", None)
+        return {key: _compute(metric, ds, kwargs, scheduler) for key, (metric, ds, kwargs) in tasks.items()}
+
+
+class PoolExecutor(Executor):
+    """Computes the (metric, model) results concurrently in a pool of ``max_workers`` workers.
+
+    Every task computes its own result, by default with the synchronous dask
+    scheduler so the pool workers do not compete with dask threads. This
+    suits metric functions that are not dask-aware, e.g. plain numpy callables.
+    """
+
+    pool = None
+
+    def run(self, tasks):
+        scheduler = self.options.get("scheduler", "synchronous")
+        with self.pool(max_workers=self.options.get("max_workers", None)) as pool:
+            futures = {key: self._submit(pool, task, scheduler) for key, task in tasks.items()}
+            return {key: future.result() for key, future in futures.items()}
+
+    def _submit(self, pool, task, scheduler):
+        metric, ds, kwargs = task
+        return pool.submit(_compute, metric, ds, kwargs, scheduler)
+
+
+@register_executor("threads")
+class ThreadsExecutor(PoolExecutor):
+    pool = ThreadPoolExecutor
+
+
+@register_executor("processes")
+class ProcessesExecutor(PoolExecutor):
+    pool = ProcessPoolExecutor
+
+    def _submit(self, pool, task, scheduler):
+        import cloudpickle
+
+        # Dask graphs can hold local functions (e.g. from map_blocks), which
+        # only cloudpickle can serialize
+        return pool.submit(_compute_pickled, cloudpickle.dumps(task), scheduler)
+
+
+@register_executor("distributed")
+class DistributedExecutor(Executor):
+    """Computes all (metric, model) results on a dask distributed cluster.
+
+    Connects to the scheduler at ``address``, or uses the current client. The
+    lazy results are computed together on the cluster, metric functions that
+    are not dask-aware are evaluated on the client while building them.
+    """
+
+    def run(self, tasks):
+        from dask.distributed import Client, get_client
+
+        address = self.options.get("address", None)
+        if address is None:
+            # The current client is not ours to close
+            return self._run(get_client(), tasks)
+        with Client(address) as client:
+            return self._run(client, tasks)
+
+    def _run(self, client, tasks):
+        results = {key: metric.compute(ds, **kwargs) for key, (metric, ds, kwargs) in tasks.items()}
+        print(f"Computing {len(results)} verification results on {client}")
+        return client.compute(results, sync=True)
+
+
+def _compute(metric, ds, kwargs, scheduler=None):
+    result = metric.compute(ds, **kwargs)
+    if hasattr(result, "compute"):
+        result = result.compute(scheduler=scheduler)
+    return result
+
+def _compute_pickled(task, scheduler=None):
+    metric, ds, kwargs = pickle.loads(task)
+    return _compute(metric, ds, kwargs, scheduler)
@@ -0,0 +1,101 @@
+from functools import reduce
+
+import numpy as np
+import xarray as xr
+
+from .accumulators import get_accumulator
+
+
+class IncrementalStore():
+    """Zarr store with the per-reference-time partial sums of the verification.
+
+    The partial sums of every model and metric are kept in the group
+    ``<model>/<metric>``, with a ``reference_time`` dimension along which new
+    reference times are appended.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, model, metric):
+        try:
+            return xr.open_zarr(self.path, group=f"{model}/{metric}")
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def reference_times(self, models, metrics):
+        """Reference times that are stored for all models and metrics."""
+        reference_times = []
+        for model in models:
+            for metric in metrics:
+                ds = self.load(model, metric)
+                if ds is None:
+                    return np.array([], dtype="datetime64[ns]")
+                reference_times.append(ds["reference_time"].values)
+        if not reference_times:
+            return np.array([], dtype="datetime64[ns]")
+        return reduce(np.intersect1d, reference_times)
+
+    def append(self, model, metric, sums):
+        if sums.sizes["reference_time"] == 0:
+            return
+        if self.load(model, metric) is None:
+            sums.to_zarr(self.path, group=f"{model}/{metric}", mode="a")
+        else:
+            sums.to_zarr(self.path, group=f"{model}/{metric}", append_dim="reference_time")
+
+
+class IncrementalMetric():
+    """Verification metric updated incrementally with the reference times of every run.
+
+    The metric is reduced over ``dim`` like the regular metrics (all
+    dimensions if None). The partial sums per reference time are kept in an
+    IncrementalStore, so reference times verified in earlier runs are not
+    recomputed. New reference times are streamed in batches of ``batch_size``.
+    The ``inputs`` of the metric function decide the order of the forecast
+    and reference, like for Metric.
+    """
+
+    def __init__(self, name, accumulator, store, inputs=None, dim=None, batch_size=None, **kwargs):
+        self.name = name
+        self.accumulator = get_accumulator(accumulator)(**kwargs)
+        self._reference_first = self.accumulator.reference_first(inputs)
+        self.store = store
+        self.dim = [dim] if isinstance(dim, str) else dim
+        self.batch_size = batch_size
+
+    def compute(self, model, ds, ds_ref, persist_until=None):
+        """Verify the reference times of ``ds`` that are not stored yet and merge with the stored ones.
+
+        Only the partial sums of reference times up to ``persist_until`` are
+        written to the store, later ones are recomputed in the next run.
+        """
+        stored = self.store.load(model, self.name)
+        reference_times = ds["reference_time"].values
+        if stored is not None:
+            reference_times = reference_times[~np.isin(reference_times, stored["reference_time"].values)]
+        print(f"Verifying {self.name} of {model} for {len(reference_times)} new reference times")
+
+        ds = ds.sel(reference_time=reference_times)
+        ds_ref = ds_ref.sel(reference_time=reference_times)
+        first, second = (ds_ref, ds) if self._reference_first else (ds, ds_ref)
+        sums = self.accumulator.stream(first, second, dim=self._partial_dim(ds), batch_size=self.batch_size)
+
+        if persist_until is not None:
+            self.store.append(model, self.name, sums.sel(reference_time=reference_times <= persist_until))
+        if stored is not None:
+            sums = xr.concat([stored[list(sums.data_vars)], sums], dim="reference_time")
+        return self._finalize(sums)
+
+    def finalize_stored(self, model):
+        """The metric of all stored reference times."""
+        return self._finalize(self.store.load(model, self.name))
+
+    def _finalize(self, sums):
+        if self.dim is None or "reference_time" in self.dim:
+            sums = sums.sum("reference_time")
+        return self.accumulator.finalize(sums)
+
+    def _partial_dim(self, ds):
+        dim = list(ds.dims) if self.dim is None else self.dim
+        return [d for d in dim if d != "reference_time"]
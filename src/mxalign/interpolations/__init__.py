@@ -1,3 +1,9 @@
 from . import base
 from . import xarray
-from . import delaunay
\ No newline at end of file
+from . import sparse
+from . import delaunay
+from . import regular
+from . import kdtree
+from . import regrid
+from . import gridding
+from . import kernels
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import xarray as xr
 from .registry import register_interpolator
 from ..properties.properties import Properties, Space
@@ -14,9 +15,25 @@ class BaseInterpolator:
 
     def __init__(self, target_dataset, **options):
         self.target_dataset = target_dataset
+        # dtype policy, by default the dtype of the input is preserved
+        self.weights_dtype = options.pop("weights_dtype", None)
+        self.compute_dtype = options.pop("compute_dtype", None)
+        self.output_dtype = options.pop("output_dtype", None)
         self.options = options
         #TODO: Check the properties
 
+    def resolve_dtypes(self, input_dtype) -> tuple[np.dtype, np.dtype, np.dtype]:
+        """Weights, compute (accumulation) and output dtype for an input of ``input_dtype``.
+
+        Non-floating inputs are computed in float64.
+        """
+        input_dtype = np.dtype(input_dtype)
+        default = input_dtype if np.issubdtype(input_dtype, np.floating) else np.dtype(np.float64)
+        compute_dtype = np.dtype(self.compute_dtype or default)
+        weights_dtype = np.dtype(self.weights_dtype or compute_dtype)
+        output_dtype = np.dtype(self.output_dtype or default)
+        return weights_dtype, compute_dtype, output_dtype
+
     #def supports(self, src: Properties, tgt: Properties):
 
     def interpolate(
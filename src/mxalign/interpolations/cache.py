@@ -0,0 +1,115 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+from scipy.sparse import csr_matrix, load_npz, save_npz
+
+DEFAULT_MAX_SIZE = 2 * 1024**3  # bytes
+
+
+_CACHE_INFO = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+
+def fingerprint(*arrays: np.ndarray, chunk_size: int = 2**20, **params) -> str:
+    """Streaming hash over the raw buffers of one or more arrays.
+
+    Arrays are hashed in flat (C-order) slices of ``chunk_size`` elements, so
+    large coordinate arrays are never copied as a whole: contiguous arrays
+    are hashed from a view, other arrays one copied slice at a time. Shape
+    and dtype are part of the hash, as are any extra keyword parameters.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for array in arrays:
+        array = np.asarray(array)
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        # reshape would copy a non-contiguous array, slicing its flat iterator only copies the slice
+        flat = array.reshape(-1) if array.flags.c_contiguous else array.flat
+        for start in range(0, array.size, chunk_size):
+            h.update(np.ascontiguousarray(flat[start:start + chunk_size]).data)
+    for key in sorted(params):
+        h.update(f"{key}={params[key]}".encode())
+    return h.hexdigest()
+
+
+def weights_key(source_points: np.ndarray, target_points: np.ndarray, **params) -> str:
+    """Fingerprint of the source and target coordinates (and extra parameters).
+
+    Used both as in-memory cache key and as file name in the WeightStore, so
+    identical grids and station networks map onto the same weights across
+    interpolators and processes.
+    """
+    return fingerprint(source_points, target_points, **params)
+
+
+def record_cache_access(kind: str):
+    _CACHE_INFO[kind] += 1
+
+
+def cache_info() -> dict:
+    """Number of weight-matrix cache hits (memory and disk) and misses."""
+    return dict(_CACHE_INFO)
+
+
+def reset_cache_info():
+    for key in _CACHE_INFO:
+        _CACHE_INFO[key] = 0
+
+
+class WeightStore:
+    """Content-addressed on-disk store for sparse interpolation weights.
+
+    Weight matrices are saved as CSR arrays in ``<key>.npz`` files. The
+    modification time of a file is refreshed on every hit, and the least
+    recently used files are evicted once the store grows beyond ``max_size``
+    bytes.
+    """
+
+    def __init__(self, path: str, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.npz")
+
+    def get(self, key: str) -> csr_matrix | None:
+        file = self._file(key)
+        try:
+            W = load_npz(file).tocsr()
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        try:
+            os.utime(file)
+        except FileNotFoundError:
+            # Evicted by another process in the meantime
+            return None
+        return W
+
+    def put(self, key: str, W: csr_matrix):
+        file = self._file(key)
+        # Write to a temporary file first so concurrent readers never see partial files
+        tmp = os.path.join(self.path, f"{key}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+        save_npz(tmp, W.tocsr(), compressed=False)
+        os.replace(tmp, file)
+        self._evict(keep=file)
+
+    def _evict(self, keep: str | None = None):
+        entries = []
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.endswith(".npz") and not entry.name.endswith(".tmp.npz"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, file in sorted(entries):
+            if total <= self.max_size:
+                break
+            if file == keep:
+                continue
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,22 +1,16 @@
-from functools import partial
-
 import numpy as np
-import dask.array as dda
-import xarray as xr 
-from functools import partial
 
-from scipy.interpolate import LinearNDInterpolator
-from scipy.spatial import Delaunay
+from scipy.spatial import ConvexHull, Delaunay
 from scipy.sparse import csr_matrix
 
-from .base import BaseInterpolator
+from .sparse import SparseInterpolator, interpolate_da, interpolate_block
 from .registry import register_interpolator
 from ..properties.properties import Space
 
 
 
 @register_interpolator
-class DelaunayInterpolator(BaseInterpolator):
+class DelaunayInterpolator(SparseInterpolator):
     name = "delaunay"
     source_space = Space.GRID
     target_space = Space.POINT
@@ -24,55 +18,109 @@ class DelaunayInterpolator(BaseInterpolator):
     def __init__(self, target_dataset, **options):
         super().__init__(target_dataset, **options)
         method = self.options.get("method", "linear")
-        self._W_cache = {}  # keyed by source grid hash
         if  method != "linear":
             raise ValueError(f"Method: {method}. Delaunay interpolation only supports linear interpolation")
-    
-    def _get_weights(self, source_points, target_points):
-        key = (source_points.shape, source_points[0,0], source_points[-1,1])  # cheap fingerprint
-        if key not in self._W_cache:
-            triangulation = Delaunay(source_points)
-            self._W_cache[key] = _build_weight_matrix(triangulation, source_points, target_points)
-        return self._W_cache[key]
-    
+
     def _interpolate(self, source_dataset):
         if "grid_index" not in source_dataset.dims:
             raise NotImplementedError("Delaunay interpolation currently only supports stacked grids")
-        
-        if "latitude" in source_dataset.dims:
-            lon_grid, lat_grid = np.meshgrid(
-                source_dataset["longitude"].values, 
-                source_dataset["latitude"].values
-            )
-            source_points = np.column_stack((lat_grid.ravel(), lon_grid.ravel()))
-        else: 
-            source_points = np.column_stack(
-              (source_dataset["latitude"].values, source_dataset["longitude"].values)
-        )
-            
-        target_points = np.column_stack(
-            (self.target_dataset["latitude"].values, self.target_dataset["longitude"].values)
-        )
-
-        # Compute triangulation and sparse weight matrix ONCE, shared across all variables
-        W = self._get_weights(source_points, target_points)
-
+        return super()._interpolate(source_dataset)
 
-        arrays_out = {}
-        for var in source_dataset.data_vars:
-            da = source_dataset[var]
-            if da.dims[-1] != "grid_index":
-                print(f"Skipping variable '{var}' - doesn't end with spatial dimension grid_index")
-                continue
-            else:
-                arrays_out[var] = interpolate_da(da, W, target_points)
+    def _weight_params(self, source_dataset):
+        return dict(
+            crop=self.options.get("crop", True),
+            crop_padding=self.options.get("crop_padding", 1.0),
+        )
 
-        ds_out = xr.Dataset(arrays_out).assign_coords(
-            latitude = self.target_dataset["latitude"],
-            longitude = self.target_dataset["longitude"]
+    def _build_weights(self, source_dataset, source_points, target_points):
+        if not self.options.get("crop", True):
+            triangulation = Delaunay(source_points)
+            return _build_weight_matrix(triangulation, source_points, target_points)
+        return _build_cropped_weight_matrix(
+            source_points,
+            target_points,
+            padding=self.options.get("crop_padding", 1.0)
         )
-        ds_out.attrs["properties"] = source_dataset.attrs["properties"]
-        return ds_out
+
+def _build_cropped_weight_matrix(
+    source_points: np.ndarray,
+    target_points: np.ndarray,
+    padding: float = 1.0,
+    max_retries: int = 3,
+) -> csr_matrix:
+    """
+    Triangulate only the source points in a padded bounding box of the targets.
+
+    The box is the latitude/longitude extent of the target points, extended by
+    ``padding`` degrees. The columns of the resulting weight matrix are mapped
+    back to the full source grid. If targets inside the convex hull of the
+    source grid (the domain of the full triangulation) are not covered by the
+    cropped triangulation, the padding is doubled (at most ``max_retries``
+    times) before falling back to the full grid. Targets outside the hull,
+    e.g. in the corners of the lat/lon box of a rotated grid, are NaN either
+    way and do not trigger a retry.
+    """
+    n_target = len(target_points)
+    n_source = len(source_points)
+    ndim = source_points.shape[1]
+    hull = None
+
+    for _ in range(max_retries + 1):
+        index = _crop_indices(source_points, target_points, padding)
+        if len(index) == n_source:
+            break
+        if len(index) <= ndim:
+            padding *= 2
+            continue
+
+        print(f"Triangulating {len(index)} of {n_source} source points")
+        cropped_points = source_points[index]
+        triangulation = Delaunay(cropped_points)
+        W = _build_weight_matrix(triangulation, cropped_points, target_points)
+
+        # Rows with NaN weights are targets outside the cropped triangulation
+        rows = np.repeat(np.arange(n_target), np.diff(W.indptr))
+        outside = np.zeros(n_target, dtype=bool)
+        outside[rows[np.isnan(W.data)]] = True
+        if outside.any():
+            if hull is None:
+                hull = ConvexHull(source_points)
+            uncovered = _in_hull(hull, target_points[outside]).any()
+        else:
+            uncovered = False
+        if not uncovered:
+            return csr_matrix((W.data, index[W.indices], W.indptr), shape=(n_target, n_source))
+        padding *= 2
+
+    triangulation = Delaunay(source_points)
+    return _build_weight_matrix(triangulation, source_points, target_points)
+
+def _in_hull(hull, points, batch_size=4096):
+    """Whether the points are inside the convex hull (up to round-off)."""
+    normals, offsets = hull.equations[:, :-1], hull.equations[:, -1]
+    inside = np.empty(len(points), dtype=bool)
+    for start in range(0, len(points), batch_size):
+        batch = points[start:start + batch_size]
+        inside[start:start + batch_size] = np.all(batch @ normals.T + offsets <= 1e-10, axis=1)
+    return inside
+
+def _crop_indices(source_points, target_points, padding):
+    """Indices of the source (lat, lon) points within the padded bounding box of the targets."""
+    lat_min = target_points[:, 0].min() - padding
+    lat_max = target_points[:, 0].max() + padding
+
+    # Longitudes relative to the centre of the targets, robust to 0/360 conventions
+    lon_center = target_points[:, 1].mean()
+    target_lon = (target_points[:, 1] - lon_center + 180.0) % 360.0 - 180.0
+    source_lon = (source_points[:, 1] - lon_center + 180.0) % 360.0 - 180.0
+    lon_min = target_lon.min() - padding
+    lon_max = target_lon.max() + padding
+
+    inside = (
+        (source_points[:, 0] >= lat_min) & (source_points[:, 0] <= lat_max) &
+        (source_lon >= lon_min) & (source_lon <= lon_max)
+    )
+    return np.flatnonzero(inside)
 
 def _build_weight_matrix(
     triangulation: Delaunay,
@@ -129,79 +177,3 @@ def _build_weight_matrix(
     print("Done")
 
     return W
-
-
-def interpolate_da(da: xr.DataArray, W: csr_matrix, target_points: np.ndarray) -> xr.DataArray:    
-    n_target = len(target_points)
-    leading_dims = da.dims[:-1]
-    
-    # Validate that grid_index is not chunked
-    if isinstance(da.data, dda.Array):
-        grid_chunks = dict(zip(da.dims, da.chunks)).get("grid_index")
-        if grid_chunks is not None and len(grid_chunks) > 1:
-            raise ValueError(
-                f"grid_index must not be chunked for Delaunay interpolation "
-                f"(found {len(grid_chunks)} chunks). Rechunk with da.chunk({{'grid_index': -1}}) "
-                f"or enforce this on the loading side."
-            )
-
-    #Build the template
-    #Get chunking info for leading dims
-    shape_tmp = tuple(da.sizes[d] for d in leading_dims) + (n_target,)
-
-    if isinstance(da.data, dda.Array):
-        dim_to_chunks = dict(zip(da.dims, da.chunks))
-    else:
-        dim_to_chunks = {dim: (da.sizes[dim],) for dim in da.dims}
-
-    chunks_tmp = tuple(
-        dim_to_chunks[dim] if dim in dim_to_chunks else (da.sizes[dim],)
-        for dim in leading_dims
-    ) + ((n_target,), )
-
-    # Create a dask array template matching the chunking pattern
-    tmp = dda.empty(shape=shape_tmp, chunks=chunks_tmp, dtype=da.dtype)
-    tmp = xr.DataArray(
-        tmp,
-        dims=leading_dims + ("point_index", ),
-        coords={d: da.coords[d].load() for d in leading_dims} 
-        )
-    
-    # Drop coords tied to grid_index to avoid dimension mismatch in map_blocks
-    spatial_coords = [c for c in da.coords if "grid_index" in da[c].dims]
-    da_clean = da.drop_vars(spatial_coords)
-
-    da_interp = da_clean.map_blocks(
-        partial(interpolate_block, W=W, target_points=target_points),
-        template=tmp
-    )
-
-    return da_interp
-
-def interpolate_block(
-        block : xr.DataArray,
-        W: csr_matrix,
-        target_points: np.ndarray,
-) -> xr.DataArray :
-    data = block.values # shape = (.., npoints)
-    original_shape = data.shape[:-1]
-    data_flat = data.reshape(-1, data.shape[-1]) # shape = (ndim1 * ndim2 * ... , npoints)
-    
-    # Identify NaN source points
-    nan_mask = np.isnan(data_flat)  # (nleading, n_source)
-
-    if nan_mask.any():
-        print(f"Warning, interpolating NaNs for variable {block.name}")
-
-    # Single sparse matrix multiply replaces the per-row interpolator loop:
-    # (nleading, n_source) @ (n_source, n_target) -> (nleading, n_target)
-    interpolated_flat = data_flat @ W.T
-    interpolated = interpolated_flat.reshape(*original_shape, target_points.shape[0])
-
-    new_dims   = block.dims[:-1] + ("point_index",)
-    new_coords = {dim: block.coords[dim] for dim in block.dims[:-1]}
-    return xr.DataArray(interpolated, dims=new_dims, coords=new_coords)
-        
-        
-
-
@@ -0,0 +1,149 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+
+from .sparse import SparseInterpolator
+from .registry import register_interpolator
+from ..properties.properties import Space
+
+EARTH_RADIUS = 6371229.0  # m
+
+
+class KDTreeInterpolator(SparseInterpolator):
+    """Base class for interpolators searching neighbours in a KD-tree on the sphere.
+
+    The source points are converted to 3-D coordinates on the unit sphere,
+    so distances are valid across the dateline and near the poles and the
+    source can be any (regular, reduced Gaussian, unstructured) grid.
+
+    Options:
+        k (int): Number of neighbours.
+        max_distance (float): Maximum great-circle distance (m) of a
+            neighbour. Target points without neighbours get NaN weights.
+        workers (int): Number of workers for the KD-tree query, -1 uses
+            all cores.
+    """
+
+    default_k: int = 1
+    source_space = Space.GRID
+    target_space = Space.POINT
+
+    def _interpolate(self, source_dataset):
+        if "grid_index" not in source_dataset.dims:
+            raise NotImplementedError(f"{self.name} interpolation currently only supports stacked grids")
+        return super()._interpolate(source_dataset)
+
+    def _weight_params(self, source_dataset):
+        return dict(
+            k=self.options.get("k", self.default_k),
+            max_distance=self.options.get("max_distance", None),
+            power=self._power(),
+        )
+
+    def _power(self):
+        return None
+
+    def _build_weights(self, source_dataset, source_points, target_points):
+        print("Calculating interpolation-weight matrix")
+        W = _build_kdtree_weight_matrix(
+            source_points,
+            target_points,
+            k=self.options.get("k", self.default_k),
+            max_distance=self.options.get("max_distance", None),
+            power=self._power(),
+            workers=self.options.get("workers", -1),
+        )
+        print("Done")
+        return W
+
+
+@register_interpolator
+class NearestInterpolator(KDTreeInterpolator):
+    """Nearest-neighbour interpolation, averaging the ``k`` nearest source points."""
+
+    name = "nearest"
+    default_k = 1
+
+
+@register_interpolator
+class IdwInterpolator(KDTreeInterpolator):
+    """Inverse-distance weighting over the ``k`` nearest source points (``power`` defaults to 2)."""
+
+    name = "idw"
+    default_k = 4
+
+    def _power(self):
+        return self.options.get("power", 2.0)
+
+
+def lonlat_to_xyz(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Convert latitude/longitude (degrees) to 3-D coordinates on the unit sphere."""
+    lat = np.deg2rad(np.asarray(latitude, dtype=np.float64))
+    lon = np.deg2rad(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_distance(chord):
+    """Convert chord lengths on the unit sphere to great-circle distances (m)."""
+    return 2.0 * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0)) * EARTH_RADIUS
+
+
+def distance_to_chord(distance):
+    """Convert great-circle distances (m) to chord lengths on the unit sphere."""
+    return 2.0 * np.sin(np.minimum(distance / EARTH_RADIUS, np.pi) / 2.0)
+
+
+def _build_kdtree_weight_matrix(
+    source_points: np.ndarray,
+    target_points: np.ndarray,
+    k: int = 1,
+    max_distance: float | None = None,
+    power: float | None = None,
+    workers: int = -1,
+) -> csr_matrix:
+    """
+    Build a sparse (n_target, n_source) weight matrix from a KD-tree query.
+
+    Points are given as (latitude, longitude) columns. With ``power=None`` the
+    ``k`` neighbours get equal weights, otherwise the weights are proportional
+    to ``distance ** -power``; a source point coinciding with the target gets
+    all the weight. Target points without neighbours within ``max_distance``
+    receive NaN weights.
+    """
+    n_target = len(target_points)
+    n_source = len(source_points)
+
+    tree = cKDTree(lonlat_to_xyz(source_points[:, 0], source_points[:, 1]))
+    upper_bound = np.inf if max_distance is None else distance_to_chord(max_distance)
+    chord, index = tree.query(
+        lonlat_to_xyz(target_points[:, 0], target_points[:, 1]),
+        k=k,
+        distance_upper_bound=upper_bound,
+        workers=workers,
+    )
+    chord = chord.reshape(n_target, k)
+    index = index.reshape(n_target, k)
+
+    # Missing neighbours are reported with an infinite distance and index n_source
+    found = np.isfinite(chord)
+    if power is None:
+        vals = found.astype(np.float64)
+    else:
+        distance = chord_to_distance(np.where(found, chord, 0.0))
+        exact = found & (distance == 0.0)
+        with np.errstate(divide="ignore"):
+            vals = np.where(found, distance ** -power, 0.0)
+        has_exact = exact.any(axis=1)
+        vals[has_exact] = exact[has_exact].astype(np.float64)
+
+    norm = vals.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vals = vals / norm  # rows without neighbours become NaN
+
+    rows = np.repeat(np.arange(n_target), k)
+    cols = np.where(found, index, 0).ravel()
+    vals = vals.ravel()
+    keep = found.ravel() | np.repeat(~found.any(axis=1), k)
+
+    return csr_matrix((vals[keep], (rows[keep], cols[keep])), shape=(n_target, n_source))
@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+_KERNELS = {}
+_POOLS = {}
+
+# Below this number of output values the thread pool overhead dominates
+MIN_PARALLEL_SIZE = 2**16
+
+
+def register_kernel(name):
+    def decorator(func):
+        _KERNELS[name] = func
+        return func
+    return decorator
+
+def available_kernels():
+    return list(_KERNELS.keys())
+
+def get_kernel(name):
+    try:
+        return _KERNELS[name]
+    except KeyError:
+        raise ValueError(f"Unknown interpolation kernel: {name}")
+
+
+@register_kernel("scipy")
+def scipy_matmul(data: np.ndarray, W: csr_matrix, **kwargs) -> np.ndarray:
+    """(n_leading, n_source) @ (n_source, n_target) product with scipy, single-threaded."""
+    return np.asarray(data @ W.T)
+
+
+@register_kernel("threaded")
+def threaded_matmul(data: np.ndarray, W: csr_matrix, n_threads: int | None = None) -> np.ndarray:
+    """
+    Multithreaded (n_leading, n_source) @ (n_source, n_target) product.
+
+    The work is split over blocks of target rows of W and blocks of leading
+    rows of the data, which are processed in a thread pool. scipy releases the
+    GIL in its sparse kernels, so the blocks run in parallel. Use it when dask
+    runs in synchronous or process mode, with the threaded scheduler the
+    threads compete with the dask workers.
+    """
+    n_threads = n_threads or os.cpu_count() or 1
+    n_leading, n_source = data.shape
+    n_target = W.shape[0]
+    if n_threads == 1 or n_leading * n_target < MIN_PARALLEL_SIZE:
+        return scipy_matmul(data, W)
+
+    dtype = np.result_type(data.dtype, W.dtype)
+    pool = _get_pool(n_threads)
+    leading_blocks = _split(n_leading, min(n_leading, n_threads))
+    target_blocks = _split(n_target, min(n_target, -(-2 * n_threads // len(leading_blocks))))
+
+    # The CSR kernel needs C-contiguous (n_source, n_leading) operands
+    data_T = list(pool.map(
+        lambda block: np.ascontiguousarray(data[block[0]:block[1]].T, dtype=dtype),
+        leading_blocks
+    ))
+    W_rows = list(pool.map(lambda block: W[block[0]:block[1]], target_blocks))
+
+    out = np.empty((n_leading, n_target), dtype=dtype)
+
+    def multiply(task):
+        (i, (t0, t1)), (j, (l0, l1)) = task
+        out[l0:l1, t0:t1] = (W_rows[i] @ data_T[j]).T
+
+    list(pool.map(multiply, product(enumerate(target_blocks), enumerate(leading_blocks))))
+    return out
+
+
+def _split(n, n_blocks):
+    bounds = np.linspace(0, n, max(n_blocks, 1) + 1).astype(int)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def _get_pool(n_threads):
+    if n_threads not in _POOLS:
+        _POOLS[n_threads] = ThreadPoolExecutor(max_workers=n_threads)
+    return _POOLS[n_threads]
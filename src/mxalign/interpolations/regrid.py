@@ -0,0 +1,167 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial import Delaunay, cKDTree
+
+from .sparse import SparseInterpolator, normalize_rows
+from .registry import register_interpolator
+from .delaunay import _build_weight_matrix
+from .regular import GRID_KEYS, fractional_grid_indices, _build_regular_weight_matrix, _check_grid_size, _get_crs_and_grid_mapping
+from .kdtree import lonlat_to_xyz
+from ..properties.properties import Space
+
+
+class Regridder(SparseInterpolator):
+    """Base class for grid-to-grid regridding with a precomputed sparse weight matrix.
+
+    The (n_target_cells, n_source_cells) weights are applied chunk-wise with the
+    same map_blocks pattern as the grid-to-point interpolators. Both source
+    and target dataset must be stacked on ``grid_index``.
+    """
+
+    source_space = Space.GRID
+    target_space = Space.GRID
+    out_dim = "grid_index"
+
+    def _interpolate(self, source_dataset):
+        if "grid_index" not in source_dataset.dims or "grid_index" not in self.target_dataset.dims:
+            raise NotImplementedError("Regridding currently only supports stacked grids")
+        return super()._interpolate(source_dataset)
+
+
+@register_interpolator
+class BilinearRegridder(Regridder):
+    """Bilinear regridding.
+
+    Uses closed-form bilinear weights when the source dataset has a ``crs``
+    and ``grid_mapping``, and linear interpolation on a Delaunay triangulation
+    of the source grid otherwise.
+    """
+
+    name = "bilinear"
+
+    def _weight_params(self, source_dataset):
+        if _is_regular(source_dataset):
+            crs, grid_mapping = _get_crs_and_grid_mapping(source_dataset)
+            return dict(crs=crs.proj4_init, **{key: grid_mapping[key] for key in GRID_KEYS})
+        return {}
+
+    def _build_weights(self, source_dataset, source_points, target_points):
+        if _is_regular(source_dataset):
+            crs, grid_mapping = _get_crs_and_grid_mapping(source_dataset)
+            _check_grid_size(source_points, grid_mapping)
+            fi, fj = fractional_grid_indices(crs, grid_mapping, target_points[:, 1], target_points[:, 0])
+            return _build_regular_weight_matrix(fi, fj, grid_mapping["nx"], grid_mapping["ny"])
+        triangulation = Delaunay(source_points)
+        return _build_weight_matrix(triangulation, source_points, target_points)
+
+
+@register_interpolator
+class ConservativeRegridder(Regridder):
+    """Approximately first-order conservative regridding, by sub-sampling.
+
+    Every target cell, a ``dx`` x ``dy`` rectangle in the target projection,
+    is sub-sampled with ``subsamples`` x ``subsamples`` points. The weight of a
+    source cell is the fraction of those points it contains. This approximates
+    the area-overlap fraction of exact conservative remapping, and converges
+    to it as ``subsamples`` grows. Use enough subsamples to resolve the
+    source cells (e.g. ``2 * dx_target / dx_source``).
+
+    The target dataset needs a ``crs`` and ``grid_mapping``. Source cells are
+    located in closed form on regular source grids. Otherwise they are found
+    with a nearest-neighbour KD-tree search, and the cell is assumed to extend
+    to half its diagonal, estimated from the distance to the nearest
+    neighbouring source point. Sub-samples outside the source domain are not
+    counted. Target cells without any covered sub-sample are NaN.
+
+    Options:
+        subsamples (int): Number of sub-sampling points per cell side (default 5).
+        batch_size (int): Number of target cells processed at once (default 65536).
+    """
+
+    name = "conservative"
+
+    def _weight_params(self, source_dataset):
+        params = dict(subsamples=self.options.get("subsamples", 5))
+        crs, grid_mapping = _get_crs_and_grid_mapping(self.target_dataset)
+        params.update(target_crs=crs.proj4_init, **{f"target_{key}": grid_mapping[key] for key in GRID_KEYS})
+        if _is_regular(source_dataset):
+            crs, grid_mapping = _get_crs_and_grid_mapping(source_dataset)
+            params.update(crs=crs.proj4_init, **{key: grid_mapping[key] for key in GRID_KEYS})
+        return params
+
+    def _build_weights(self, source_dataset, source_points, target_points):
+        import cartopy.crs as ccrs
+
+        print("Calculating regridding-weight matrix")
+        n = self.options.get("subsamples", 5)
+        batch_size = self.options.get("batch_size", 2**16)
+
+        target_crs, target_grid = _get_crs_and_grid_mapping(self.target_dataset)
+        nx, ny = target_grid["nx"], target_grid["ny"]
+        n_target = nx * ny
+        n_source = len(source_points)
+        if len(target_points) != n_target:
+            raise ValueError(f"Size of target grid_index ({len(target_points)}) does not match product of nx and ny ({n_target})")
+
+        x_ll, y_ll = target_crs.transform_point(
+            x=target_grid["lon_ll"],
+            y=target_grid["lat_ll"],
+            src_crs=ccrs.PlateCarree()
+        )
+        offsets = (np.arange(n) + 0.5) / n - 0.5
+        dx_sub, dy_sub = np.meshgrid(offsets * target_grid["dx"], offsets * target_grid["dy"])
+
+        if _is_regular(source_dataset):
+            source_crs, source_grid = _get_crs_and_grid_mapping(source_dataset)
+            if len(source_points) != source_grid["nx"] * source_grid["ny"]:
+                raise ValueError(f"Size of grid_index ({len(source_points)}) does not match product of nx and ny")
+            tree = None
+        else:
+            source_xyz = lonlat_to_xyz(source_points[:, 0], source_points[:, 1])
+            tree = cKDTree(source_xyz)
+            # A sub-sample is in a source cell if it is within half the cell
+            # diagonal of its center, the cell size is estimated from the
+            # distance to the nearest neighbouring center
+            spacing = tree.query(source_xyz, k=2, workers=-1)[0][:, 1]
+            cutoff = spacing / np.sqrt(2)
+
+        rows, cols = [], []
+        for start in range(0, n_target, batch_size):
+            cells = np.arange(start, min(start + batch_size, n_target))
+            x = x_ll + (cells % nx)[:, None] * target_grid["dx"] + dx_sub.ravel()[None, :]
+            y = y_ll + (cells // nx)[:, None] * target_grid["dy"] + dy_sub.ravel()[None, :]
+            lonlat = ccrs.PlateCarree().transform_points(target_crs, x.ravel(), y.ravel())
+            lon, lat = lonlat[:, 0], lonlat[:, 1]
+
+            if tree is None:
+                fi, fj = fractional_grid_indices(source_crs, source_grid, lon, lat)
+                i = np.rint(fi)
+                j = np.rint(fj)
+                valid = (i >= 0) & (i < source_grid["nx"]) & (j >= 0) & (j < source_grid["ny"])
+                source_cell = np.where(valid, j * source_grid["nx"] + i, 0).astype(np.int64)
+            else:
+                valid = np.isfinite(lat) & np.isfinite(lon)
+                distance, source_cell = tree.query(
+                    lonlat_to_xyz(np.where(valid, lat, 0.0), np.where(valid, lon, 0.0)),
+                    distance_upper_bound=cutoff.max(),
+                    workers=-1
+                )
+                valid &= np.isfinite(distance)
+                source_cell = np.where(valid, source_cell, 0)
+                valid &= distance <= cutoff[source_cell]
+
+            rows.append(np.repeat(cells, n * n)[valid])
+            cols.append(source_cell[valid])
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        # Duplicate (row, col) pairs are summed: counts of sub-samples per source cell
+        counts = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_target, n_source))
+        W = normalize_rows(counts)
+        print("Done")
+        return W
+
+
+def _is_regular(ds):
+    grid_mapping = ds.attrs.get("grid_mapping", None)
+    return "crs" in ds.attrs and isinstance(grid_mapping, dict) and all(key in grid_mapping for key in GRID_KEYS)
@@ -0,0 +1,144 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .sparse import SparseInterpolator
+from .registry import register_interpolator
+from ..properties.properties import Space
+
+GRID_KEYS = ("nx", "ny", "dx", "dy", "lon_ll", "lat_ll")
+
+
+@register_interpolator
+class RegularGridInterpolator(SparseInterpolator):
+    """Interpolation on regular (projected) grids without triangulation.
+
+    The target points are projected with the ``crs`` of the source dataset and
+    their fractional grid indices are computed in closed form from the
+    ``grid_mapping`` (``nx``, ``ny``, ``dx``, ``dy``, ``lon_ll``, ``lat_ll``).
+    The stacked ``grid_index`` is assumed to be ordered row-major from the
+    lower-left corner, i.e. ``grid_index = j * nx + i`` as in
+    ``SpaceAccessor.unstack``.
+    """
+
+    name = "regular"
+    source_space = Space.GRID
+    target_space = Space.POINT
+
+    def __init__(self, target_dataset, **options):
+        super().__init__(target_dataset, **options)
+        # "method" selects the interpolator in interpolate()/align_space, hence "kind"
+        kind = self.options.get("kind", "linear")
+        if kind not in ("linear", "nearest"):
+            raise ValueError(f"Kind: {kind}. Regular grid interpolation only supports 'linear' and 'nearest'")
+
+    def _interpolate(self, source_dataset):
+        if "grid_index" not in source_dataset.dims:
+            raise NotImplementedError("Regular grid interpolation currently only supports stacked grids")
+        return super()._interpolate(source_dataset)
+
+    def _weight_params(self, source_dataset):
+        crs, grid_mapping = _get_crs_and_grid_mapping(source_dataset)
+        return dict(
+            kind=self.options.get("kind", "linear"),
+            crs=crs.proj4_init,
+            **{key: grid_mapping[key] for key in GRID_KEYS}
+        )
+
+    def _build_weights(self, source_dataset, source_points, target_points):
+        crs, grid_mapping = _get_crs_and_grid_mapping(source_dataset)
+        _check_grid_size(source_points, grid_mapping)
+        nx, ny = grid_mapping["nx"], grid_mapping["ny"]
+
+        fi, fj = fractional_grid_indices(crs, grid_mapping, target_points[:, 1], target_points[:, 0])
+        return _build_regular_weight_matrix(
+            fi, fj, nx, ny, kind=self.options.get("kind", "linear")
+        )
+
+
+def _get_crs_and_grid_mapping(source_dataset):
+    try:
+        crs = source_dataset.attrs["crs"]
+    except KeyError:
+        raise KeyError("Source dataset does not have a crs-attribute")
+    try:
+        grid_mapping = source_dataset.attrs["grid_mapping"]
+    except KeyError:
+        raise KeyError("Source dataset does not have a grid_mapping-attribute")
+    missing = [key for key in GRID_KEYS if key not in grid_mapping]
+    if missing:
+        raise KeyError(f"grid_mapping is missing the keys {missing}")
+    return crs, grid_mapping
+
+
+def _check_grid_size(points, grid_mapping):
+    n = grid_mapping["nx"] * grid_mapping["ny"]
+    if len(points) != n:
+        raise ValueError(f"Size of grid_index ({len(points)}) does not match product of nx and ny ({n})")
+
+
+def fractional_grid_indices(crs, grid_mapping, longitude, latitude):
+    """Fractional (i, j) grid indices of lon/lat points on a regular grid in ``crs``."""
+    import cartopy.crs as ccrs
+
+    x_ll, y_ll = crs.transform_point(
+        x=grid_mapping["lon_ll"],
+        y=grid_mapping["lat_ll"],
+        src_crs=ccrs.PlateCarree()
+    )
+    xyz = crs.transform_points(
+        x=np.asarray(longitude, dtype=np.float64),
+        y=np.asarray(latitude, dtype=np.float64),
+        src_crs=ccrs.PlateCarree()
+    )
+    fi = (xyz[:, 0] - x_ll) / grid_mapping["dx"]
+    fj = (xyz[:, 1] - y_ll) / grid_mapping["dy"]
+    return fi, fj
+
+
+def _build_regular_weight_matrix(
+    fi: np.ndarray,
+    fj: np.ndarray,
+    nx: int,
+    ny: int,
+    kind: str = "linear",
+) -> csr_matrix:
+    """
+    Build a sparse (n_target, nx * ny) weight matrix from fractional grid indices.
+
+    With ``kind="linear"`` every target point gets the bilinear weights of
+    the four surrounding cells, with ``kind="nearest"`` a single weight of
+    one for the closest cell. Target points outside the grid receive NaN
+    weights, consistent with the Delaunay interpolator.
+    """
+    n_target = len(fi)
+    # Allow for round-off of points exactly on the edge of the grid
+    eps = 1e-6
+    inside = np.isfinite(fi) & np.isfinite(fj) & \
+        (fi >= -eps) & (fi <= nx - 1 + eps) & (fj >= -eps) & (fj <= ny - 1 + eps)
+    fi = np.where(inside, np.clip(fi, 0, nx - 1), 0.0)
+    fj = np.where(inside, np.clip(fj, 0, ny - 1), 0.0)
+
+    if kind == "nearest":
+        cols = np.rint(fj).astype(np.int64) * nx + np.rint(fi).astype(np.int64)
+        rows = np.arange(n_target)
+        vals = np.where(inside, 1.0, np.nan)
+    else:
+        # Lower-left corner of the enclosing cell, clipped so points on the
+        # last row/column still have a valid upper-right neighbour
+        i0 = np.clip(np.floor(fi).astype(np.int64), 0, max(nx - 2, 0))
+        j0 = np.clip(np.floor(fj).astype(np.int64), 0, max(ny - 2, 0))
+        i1 = np.minimum(i0 + 1, nx - 1)
+        j1 = np.minimum(j0 + 1, ny - 1)
+        wx = fi - i0
+        wy = fj - j0
+
+        cols = np.stack([j0 * nx + i0, j0 * nx + i1, j1 * nx + i0, j1 * nx + i1], axis=1)
+        vals = np.stack([(1 - wx) * (1 - wy), wx * (1 - wy), (1 - wx) * wy, wx * wy], axis=1)
+        vals[~inside] = np.nan
+
+        rows = np.repeat(np.arange(n_target), 4)
+        cols = cols.ravel()
+        vals = vals.ravel()
+
+    # Duplicate (row, col) pairs on degenerate grids are summed by csr_matrix
+    return csr_matrix((vals, (rows, cols)), shape=(n_target, nx * ny))
@@ -0,0 +1,403 @@
+from functools import partial
+
+import numpy as np
+import dask.array as dda
+import xarray as xr
+from scipy.sparse import csr_matrix, diags
+
+from .base import BaseInterpolator
+from .kernels import get_kernel, scipy_matmul
+from .cache import WeightStore, fingerprint, weights_key, record_cache_access, DEFAULT_MAX_SIZE
+from ..properties.properties import Space
+
+
+FUSED_DIM = "fused_variable"
+
+
+class SparseInterpolator(BaseInterpolator):
+    """Base class for interpolators that apply a precomputed sparse weight matrix.
+
+    Subclasses implement ``_build_weights``, returning a (n_target, n_source)
+    CSR matrix. Weights are cached in memory, keyed by a fingerprint of the
+    source and target coordinates, and optionally on disk (``cache_dir``).
+    The values along the ``in_dim`` dimension are interpolated onto the
+    ``out_dim`` dimension.
+
+    Missing source values can be handled with the ``mask`` option, which
+    removes invalid source points from the weights and renormalizes the
+    weights over the remaining valid ones:
+
+        - ``None``: no masking, NaN sources propagate to their targets.
+        - ``"static"``: per variable, the validity of the first slice along the
+          leading dimensions (e.g. a land-sea or missing-cell mask that does
+          not change in time).
+        - name of a variable in the source dataset, or an array over
+          ``in_dim``: validity mask (non-zero and not NaN) for all variables.
+
+    Variables with the same dims, chunks, dtype and weights are fused into a
+    single sparse product per chunk, unless ``fuse=False``.
+
+    The sparse product itself is computed by the ``kernel`` option: ``"scipy"``
+    (default, single-threaded) or ``"threaded"`` (``kernel_threads`` threads,
+    all cores by default), see ``interpolations.kernels``.
+    """
+
+    in_dim: str = "grid_index"
+    out_dim: str = "point_index"
+
+    def __init__(self, target_dataset, **options):
+        super().__init__(target_dataset, **options)
+        self._W_cache = {}  # keyed by source/target coordinate fingerprint
+        self._masked_W_cache = {}  # keyed by weights and validity-mask fingerprint
+        self._typed_W_cache = {}  # keyed by weights and dtype
+
+        # Optional persistent weight store, shared between processes/runs
+        cache_dir = self.options.get("cache_dir", None)
+        if cache_dir is not None:
+            self._store = WeightStore(
+                cache_dir,
+                max_size=self.options.get("cache_max_size", DEFAULT_MAX_SIZE)
+            )
+        else:
+            self._store = None
+
+    def _build_weights(self, source_dataset, source_points, target_points) -> csr_matrix:
+        raise NotImplementedError
+
+    def _weight_params(self, source_dataset) -> dict:
+        """Parameters, besides the coordinates, that the weights depend on."""
+        return {}
+
+    def _get_weights(self, source_dataset, source_points, target_points):
+        key = weights_key(
+            source_points,
+            target_points,
+            name=self.name,
+            **self._weight_params(source_dataset)
+        )
+        if key in self._W_cache:
+            record_cache_access("hits")
+            return self._W_cache[key]
+
+        W = self._store.get(key) if self._store is not None else None
+        if W is None:
+            record_cache_access("misses")
+            W = self._build_weights(source_dataset, source_points, target_points)
+            if self._store is not None:
+                self._store.put(key, W)
+        else:
+            record_cache_access("disk_hits")
+            print("Loaded interpolation-weight matrix from cache")
+        self._W_cache[key] = W
+        return W
+
+    def _interpolate(self, source_dataset):
+        source_points = _source_points(source_dataset)
+        target_points = np.column_stack(
+            (self.target_dataset["latitude"].values, self.target_dataset["longitude"].values)
+        )
+
+        # Compute the sparse weight matrix ONCE, shared across all variables
+        W = self._get_weights(source_dataset, source_points, target_points)
+        mask = self.options.get("mask", None)
+
+        # Variables with the same layout and weights are interpolated together
+        groups = {}
+        for var in source_dataset.data_vars:
+            da = source_dataset[var]
+            if da.dims[-1] != self.in_dim:
+                print(f"Skipping variable '{var}' - doesn't end with spatial dimension {self.in_dim}")
+                continue
+            else:
+                W_var = W
+                if mask is not None:
+                    W_var = self._get_masked_weights(W, self._get_validity(source_dataset, da, mask))
+                weights_dtype, compute_dtype, output_dtype = self.resolve_dtypes(da.dtype)
+                W_var = self._get_typed_weights(W_var, weights_dtype)
+                key = (da.dims, da.shape, da.chunks, da.dtype.str, id(W_var))
+                if not self.options.get("fuse", True):
+                    key = var
+                groups.setdefault(key, ([], W_var, compute_dtype, output_dtype))[0].append(var)
+
+        kernel = partial(
+            get_kernel(self.options.get("kernel", "scipy")),
+            n_threads=self.options.get("kernel_threads", None)
+        )
+
+        arrays_out = {}
+        for variables, W_var, compute_dtype, output_dtype in groups.values():
+            interpolate_kwargs = dict(
+                in_dim=self.in_dim,
+                out_dim=self.out_dim,
+                compute_dtype=compute_dtype,
+                output_dtype=output_dtype,
+                kernel=kernel,
+            )
+            if len(variables) == 1:
+                var = variables[0]
+                arrays_out[var] = interpolate_da(
+                    source_dataset[var], W_var, target_points, **interpolate_kwargs
+                )
+            else:
+                arrays_out.update(interpolate_fused(
+                    source_dataset, variables, W_var, target_points, **interpolate_kwargs
+                ))
+
+        # Keep the order of the variables in the source dataset
+        arrays_out = {var: arrays_out[var] for var in source_dataset.data_vars if var in arrays_out}
+        ds_out = xr.Dataset(arrays_out).assign_coords(
+            latitude = self.target_dataset["latitude"],
+            longitude = self.target_dataset["longitude"]
+        )
+        ds_out.attrs["properties"] = source_dataset.attrs["properties"]
+
+        # Output on a grid inherits the projection of the target grid
+        if self.target_space == Space.GRID:
+            for attr in ("crs", "grid_mapping"):
+                if attr in self.target_dataset.attrs:
+                    ds_out.attrs[attr] = self.target_dataset.attrs[attr]
+        return ds_out
+
+
+    def _get_validity(self, source_dataset, da, mask):
+        if isinstance(mask, str) and mask == "static":
+            first = da.isel({dim: 0 for dim in da.dims[:-1]})
+            valid = first.notnull().values
+        else:
+            if isinstance(mask, str):
+                mask = source_dataset[mask]
+            mask = np.asarray(mask)
+            valid = np.isfinite(mask) & (mask != 0)
+        if valid.shape != (da.sizes[self.in_dim],):
+            raise ValueError(f"Validity mask of shape {valid.shape} does not match {self.in_dim} of size {da.sizes[self.in_dim]}")
+        return valid
+
+    def _get_typed_weights(self, W, dtype):
+        if W.dtype == dtype:
+            return W
+        key = (id(W), dtype.str)
+        if key not in self._typed_W_cache:
+            self._typed_W_cache[key] = W.astype(dtype)
+        return self._typed_W_cache[key]
+
+    def _get_masked_weights(self, W, valid):
+        key = (id(W), fingerprint(valid))
+        if key not in self._masked_W_cache:
+            self._masked_W_cache[key] = mask_weights(W, valid)
+        return self._masked_W_cache[key]
+
+
+def _source_points(source_dataset):
+    if "latitude" in source_dataset.dims:
+        lon_grid, lat_grid = np.meshgrid(
+            source_dataset["longitude"].values,
+            source_dataset["latitude"].values
+        )
+        return np.column_stack((lat_grid.ravel(), lon_grid.ravel()))
+    return np.column_stack(
+        (source_dataset["latitude"].values, source_dataset["longitude"].values)
+    )
+
+
+def mask_weights(W: csr_matrix, valid: np.ndarray) -> csr_matrix:
+    """Remove the weights of invalid source points and renormalize over the valid ones.
+
+    Targets without any valid source point get NaN, targets that already had
+    NaN weights (e.g. outside the source domain) keep them.
+    """
+    W = W.tocsr(copy=True)
+    W.data[~valid[W.indices]] = 0.0
+    W.eliminate_zeros()
+    return normalize_rows(W)
+
+
+def normalize_rows(W: csr_matrix) -> csr_matrix:
+    """Scale the rows of W to sum to one; empty rows get a single NaN weight."""
+    row_sum = np.asarray(W.sum(axis=1)).ravel()
+    empty = row_sum == 0
+    with np.errstate(divide="ignore"):
+        W = diags(np.where(empty, 0.0, 1.0 / row_sum)) @ W
+    if empty.any():
+        W = W + csr_matrix(
+            (np.full(empty.sum(), np.nan), (np.flatnonzero(empty), np.zeros(empty.sum(), dtype=np.int64))),
+            shape=W.shape
+        )
+    return W.tocsr()
+
+
+def interpolate_da(
+        da: xr.DataArray,
+        W: csr_matrix,
+        target_points: np.ndarray,
+        in_dim: str = "grid_index",
+        out_dim: str = "point_index",
+        compute_dtype=None,
+        output_dtype=None,
+        kernel=None,
+) -> xr.DataArray:
+    n_target = len(target_points)
+    compute_dtype = np.dtype(compute_dtype or np.result_type(da.dtype, W.dtype))
+    output_dtype = np.dtype(output_dtype or compute_dtype)
+    leading_dims = da.dims[:-1]
+    
+    # A chunked input dimension is handled with a blocked sparse matmul
+    if isinstance(da.data, dda.Array):
+        grid_chunks = dict(zip(da.dims, da.chunks)).get(in_dim)
+        if grid_chunks is not None and len(grid_chunks) > 1:
+            return interpolate_chunked_da(
+                da, W, target_points, out_dim=out_dim,
+                compute_dtype=compute_dtype, output_dtype=output_dtype, kernel=kernel
+            )
+
+    #Build the template
+    #Get chunking info for leading dims
+    shape_tmp = tuple(da.sizes[d] for d in leading_dims) + (n_target,)
+
+    if isinstance(da.data, dda.Array):
+        dim_to_chunks = dict(zip(da.dims, da.chunks))
+    else:
+        dim_to_chunks = {dim: (da.sizes[dim],) for dim in da.dims}
+
+    chunks_tmp = tuple(
+        dim_to_chunks[dim] if dim in dim_to_chunks else (da.sizes[dim],)
+        for dim in leading_dims
+    ) + ((n_target,), )
+
+    # Create a dask array template matching the chunking pattern
+    tmp = dda.empty(shape=shape_tmp, chunks=chunks_tmp, dtype=output_dtype)
+    tmp = xr.DataArray(
+        tmp,
+        dims=leading_dims + (out_dim, ),
+        coords={d: da.coords[d].load() for d in leading_dims} 
+        )
+    
+    # Drop coords tied to the input dimension to avoid dimension mismatch in map_blocks
+    spatial_coords = [c for c in da.coords if in_dim in da[c].dims]
+    da_clean = da.drop_vars(spatial_coords)
+
+    da_interp = da_clean.map_blocks(
+        partial(
+            interpolate_block,
+            W=W,
+            target_points=target_points,
+            out_dim=out_dim,
+            compute_dtype=compute_dtype,
+            output_dtype=output_dtype,
+            kernel=kernel,
+        ),
+        template=tmp
+    )
+
+    return da_interp
+
+def interpolate_fused(
+        source_dataset: xr.Dataset,
+        variables: list[str],
+        W: csr_matrix,
+        target_points: np.ndarray,
+        **kwargs,
+) -> dict[str, xr.DataArray]:
+    """
+    Interpolate several variables with identical dims and chunks in one sparse product per chunk.
+
+    The variables are stacked along a temporary leading dimension (in a single
+    chunk), so every block multiplies a wider right-hand side with W and the
+    graph holds one interpolation task per chunk instead of one per variable
+    and chunk. The result is split into the original variables afterwards.
+    """
+    fused = xr.concat(
+        [source_dataset[var] for var in variables],
+        dim=FUSED_DIM,
+        coords="minimal",
+        compat="override",
+        join="override",
+    )
+    if isinstance(fused.data, dda.Array):
+        fused = fused.chunk({FUSED_DIM: -1})
+
+    fused_interp = interpolate_da(fused, W, target_points, **kwargs)
+    return {
+        var: fused_interp.isel({FUSED_DIM: i}, drop=True).rename(var)
+        for i, var in enumerate(variables)
+    }
+
+def interpolate_chunked_da(
+        da: xr.DataArray,
+        W: csr_matrix,
+        target_points: np.ndarray,
+        out_dim: str = "point_index",
+        compute_dtype=None,
+        output_dtype=None,
+        kernel=None,
+) -> xr.DataArray:
+    """
+    Sparse interpolation of a DataArray that is chunked along its last (spatial) dimension.
+
+    The columns of W (the source points) are partitioned like the chunks of
+    the data. Every block produces the partial product with its own rows, and the
+    partial products of all source chunks are summed with a dask tree
+    reduction. Memory per task is bounded by the chunk size, instead of
+    requiring the full spatial dimension in a single chunk.
+    """
+    n_target = len(target_points)
+    leading_dims = da.dims[:-1]
+    compute_dtype = np.dtype(compute_dtype or np.result_type(da.dtype, W.dtype))
+    output_dtype = np.dtype(output_dtype or compute_dtype)
+    data = da.data
+    n_chunks = len(data.chunks[-1])
+
+    # Column blocks of W matching the source chunks, sliced once as row blocks of W.T
+    Wt = W.T.tocsr()
+    bounds = np.cumsum((0,) + data.chunks[-1])
+    W_chunks = [Wt[start:stop].T.tocsr() for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    partial_products = data.map_blocks(
+        _partial_product,
+        W_chunks=W_chunks,
+        compute_dtype=compute_dtype,
+        kernel=kernel or scipy_matmul,
+        new_axis=data.ndim,
+        chunks=data.chunks[:-1] + ((1,) * n_chunks, (n_target,)),
+        dtype=compute_dtype,
+        meta=np.array((), dtype=compute_dtype),
+    )
+    interpolated = partial_products.sum(axis=-2, dtype=compute_dtype).astype(output_dtype)
+
+    return xr.DataArray(
+        interpolated,
+        dims=leading_dims + (out_dim,),
+        coords={d: da.coords[d] for d in leading_dims if d in da.coords},
+        name=da.name,
+    )
+
+def _partial_product(block, W_chunks, compute_dtype, kernel, block_info=None):
+    W_chunk = W_chunks[block_info[0]["chunk-location"][-1]]
+    block_flat = block.reshape(-1, block.shape[-1]).astype(compute_dtype, copy=False)
+    product = np.asarray(kernel(block_flat, W_chunk), dtype=compute_dtype)
+    return product.reshape(*block.shape[:-1], 1, W_chunk.shape[0])
+
+def interpolate_block(
+        block : xr.DataArray,
+        W: csr_matrix,
+        target_points: np.ndarray,
+        out_dim: str = "point_index",
+        compute_dtype=None,
+        output_dtype=None,
+        kernel=None,
+) -> xr.DataArray :
+    data = block.values # shape = (.., npoints)
+    original_shape = data.shape[:-1]
+    data_flat = data.reshape(-1, data.shape[-1]) # shape = (ndim1 * ndim2 * ... , npoints)
+    if compute_dtype is not None:
+        data_flat = data_flat.astype(compute_dtype, copy=False)
+
+    # Single sparse matrix multiply replaces the per-row interpolator loop:
+    # (nleading, n_source) @ (n_source, n_target) -> (nleading, n_target)
+    interpolated_flat = (kernel or scipy_matmul)(data_flat, W)
+    if output_dtype is not None:
+        interpolated_flat = interpolated_flat.astype(output_dtype, copy=False)
+    interpolated = interpolated_flat.reshape(*original_shape, target_points.shape[0])
+
+    new_dims   = block.dims[:-1] + (out_dim,)
+    new_coords = {dim: block.coords[dim] for dim in block.dims[:-1]}
+    return xr.DataArray(interpolated, dims=new_dims, coords=new_coords)
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import xarray as xr
 
@@ -27,12 +29,19 @@ COORDS = dict(
 )
 
 DEFAULTS={
-    "chunks": "auto"
+    "chunks": {}
 }
 
 
 @register_loader
 class AnemoiDatasetsLoader(BaseLoader):
+    """Loader for anemoi-datasets zarr stores.
+
+    Every variable is exposed as a slice of one dask array of the ``data``
+    array of the store, with the chunks of the store: opening reads only the
+    coordinates, and computing a variable only reads the chunks it lies in.
+    The ``chunks`` option rechunks the selected variables.
+    """
 
     name = "anemoi-datasets"
     
@@ -41,56 +50,50 @@ class AnemoiDatasetsLoader(BaseLoader):
     uncertainty=Uncertainty.DETERMINISTIC
     
     def _load(self):
+        files = self.files if isinstance(self.files, list) else [self.files]
+        chunks = self.kwargs.get("chunks", DEFAULTS["chunks"])
 
-        if isinstance(self.files, list):
-            dss = [
-                xr.open_zarr(file, consolidated=False) 
-                for file in self.files
-            ]
-            dss_postproc = [_postprocess(ds) for ds in dss]
-            ds_postproc = xr.concat(dss_postproc, dim="valid_time")
-        else:
-            ds = xr.open_zarr(self.files,consolidated=False)
-            ds_postproc = _postprocess(ds)
-             
-        if self.variables:
-            ds_selected = ds_postproc.sel(variable=self.variables)
-        else:
-            ds_selected = ds_postproc
-            if len(ds_selected["variable"]) > 10:
-                print(f"Transforming anemoi-datasets xr.DataArray with {len(ds_postproc['variable'])} variables to xr.Dataset, this might take some time. Consider selecting the relevant variables during loading")
-        return ds_selected.to_dataset(dim="variable")
+        # Open (and read the coordinates of) the stores concurrently
+        with ThreadPoolExecutor() as pool:
+            dss = list(pool.map(lambda file: _open_view(file, self.variables, chunks), files))
+        if len(dss) == 1:
+            return dss[0]
+        return xr.concat(dss, dim="valid_time")
 
-def _postprocess(dataset : xr.Dataset) -> xr.Dataset:
-    """Post-process the dataset to add coordinates and drop unused variables.
+def _open_view(file, variables=None, chunks=None) -> xr.Dataset:
+    """Open an anemoi-datasets store as a dataset of lazy per-variable views.
 
     Args:
-        dataset (xr.Dataset): The input dataset to be processed.
+        file (str): Path of the zarr store.
+        variables (list[str], optional): Variables to include, by default all
+            variables except the forcings in DROP_VARS.
+        chunks (optional): Chunks of the variables, by default the chunks
+            of the store.
 
     Returns:
-        xr.Dataset: The processed dataset with assigned coordinates and
-            attributes.
+        xr.Dataset: The variables on (valid_time, grid_index), with the
+            coordinates and attributes of the store.
     """
-    
-    # Add coordinates
-    coords = {key: dataset[value].astype("datetime64[ns]").load() if key == "valid_time" else dataset[value].load() for key, value in COORDS.items()}
-    for key in ("latitude","longitude"):
-        coords[key] = coords[key].astype(np.float32)
-
-    coords["variable"] = dataset.attrs["variables"]
-    coords["valid_time"] = coords["valid_time"].astype("datetime64[ns]")
-    ds_coords = dataset.assign_coords(coords)
+    # One dask array with the zarr chunks, every variable is a slice of it
+    store = xr.open_zarr(file, consolidated=False, chunks={})
+    names = list(store.attrs["variables"])
+    if variables:
+        missing = [var for var in variables if var not in names]
+        if missing:
+            raise ValueError(f"Variables {missing} not found in {file}")
+    else:
+        variables = [var for var in names if var not in DROP_VARS]
 
-    # Drop unused variables and remove ensemble dimension
-    drop_vars = [var for var in DROP_VARS if var in coords["variable"]]
-    
-    ds_pruned = ds_coords["data"].isel(
-        ensemble=0
-    ).drop_sel(
-        variable=drop_vars
-    ).swap_dims(
-        {"time":"valid_time"}
-    ).rename(
-        {"cell":"grid_index"}
+    data = store["data"].variable.isel(ensemble=0)
+    ds = xr.Dataset(
+        {var: (("valid_time", "grid_index"), data.isel(variable=names.index(var)), data.attrs) for var in variables},
+        coords={
+            "valid_time": store[COORDS["valid_time"]].values.astype("datetime64[ns]"),
+            "latitude": ("grid_index", store[COORDS["latitude"]].values.astype(np.float32)),
+            "longitude": ("grid_index", store[COORDS["longitude"]].values.astype(np.float32)),
+        },
+        attrs=store.attrs,
     )
-    return ds_pruned
+    if chunks:
+        ds = ds.chunk(chunks)
+    return ds
@@ -1,11 +1,21 @@
+from functools import partial
+
+import numpy as np
+from xarray.backends.locks import HDF5_LOCK
+
 from .registry import register_loader
 from ..properties.properties import Space, Time, Uncertainty
 from .base import BaseLoader
 
 DEFAULTS={
-    "chunks": "auto"
+    "chunks": "auto",
+    "parallel": True,
 }
 
+# netCDF4/HDF5 is not thread-safe. This is xarray's lock for HDF5 access,
+# which can be pickled with the dask graph
+_NETCDF_LOCK = HDF5_LOCK
+
 @register_loader
 class AnemoiInferenceLoader(BaseLoader):
 
@@ -18,12 +28,20 @@ class AnemoiInferenceLoader(BaseLoader):
     def _load(self):
         import xarray as xr
         
-        files = [files] if isinstance(self.files, str) else self.files
+        files = [self.files] if isinstance(self.files, str) else self.files
+        index = self._reference_index()
+        if index is not None:
+            index.update(files)
+            return self._fast_open(files, index=index)
+        if self.kwargs.get("fast_open", False):
+            return self._fast_open(files)
  
         times = xr.open_dataset(files[0])["time"].values
         lead_times = times - times[0]    
 
         kwargs = self.kwargs.copy()
+        kwargs.pop("fast_open", None)
+        kwargs.pop("reference_index", None)
         for k, v in DEFAULTS.items():
             kwargs[k] = self.kwargs.get(k,v)
 
@@ -40,6 +58,117 @@ class AnemoiInferenceLoader(BaseLoader):
 
         return ds_out
 
+    def _fast_open(self, files, index=None):
+        """Assemble the forecast from per-file lazy arrays, using the metadata of the first file.
+
+        Only the first file is opened with xarray. The other files are assumed
+        to have the same structure, which is verified with a cheap header
+        check (dimensions, variables and lead times), and their variables are
+        read lazily with netCDF4, without CF decoding or coordinate alignment.
+        With a ReferenceIndex, the headers and arrays are read through the
+        kerchunk references instead, without opening the files.
+        """
+        import dask.array as da
+        import xarray as xr
+
+        first = xr.open_dataset(files[0]) if index is None else index.open_dataset(files[0])
+        lead_times = first["time"].values - first["time"].values[0]
+        variables = [
+            var for var in first.data_vars
+            if first[var].dims == ("time", "values") and (not self.variables or var in self.variables)
+        ]
+        read_header = _read_header if index is None else partial(_reference_header, index)
+        header = read_header(files[0])
+
+        reference_times = []
+        for file in files:
+            file_header = read_header(file)
+            if file_header["dimensions"] != header["dimensions"] or file_header["variables"] != header["variables"]:
+                raise ValueError(f"File {file} does not have the same structure as {files[0]}, fast_open is not possible")
+            if not np.array_equal(file_header["time"] - file_header["time"][0], lead_times):
+                raise ValueError(f"File {file} does not have the same lead times as {files[0]}, fast_open is not possible")
+            reference_times.append(file_header["time"][0])
+
+        chunks = self.kwargs.get("chunks", DEFAULTS["chunks"])
+        if isinstance(chunks, dict):
+            chunks = (
+                chunks.get("lead_time", chunks.get("time", "auto")),
+                chunks.get("grid_index", chunks.get("values", "auto")),
+            )
+        data_vars = {}
+        for var in variables:
+            if index is not None:
+                # Chunked like the files, one dask chunk per stored chunk
+                arrays = [index.array(file, var) for file in files]
+                data_vars[var] = (("reference_time", "lead_time", "grid_index"), da.stack(arrays), first[var].attrs)
+                continue
+            arrays = [
+                da.from_array(
+                    _LazyVariable(file, var, first[var].shape, first[var].dtype),
+                    chunks=chunks,
+                    lock=_NETCDF_LOCK,
+                    asarray=True,
+                    # Avoids opening the file to infer the array type
+                    meta=np.empty((0, 0), dtype=first[var].dtype),
+                    name=f"anemoi-inference-{var}-{file}",
+                )
+                for file in files
+            ]
+            data_vars[var] = (("reference_time", "lead_time", "grid_index"), da.stack(arrays), first[var].attrs)
+
+        coords = {
+            "reference_time": np.array(reference_times, dtype="datetime64[ns]"),
+            "lead_time": lead_times,
+            "latitude": ("grid_index", first["latitude"].values),
+            "longitude": ("grid_index", first["longitude"].values),
+        }
+        return xr.Dataset(data_vars, coords=coords, attrs=first.attrs)
+
+
+class _LazyVariable():
+    """Array-like that reads a variable of a netCDF file on indexing."""
+
+    def __init__(self, file, name, shape, dtype):
+        self.file = file
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+        self.ndim = len(shape)
+
+    def __getitem__(self, key):
+        import netCDF4
+
+        with netCDF4.Dataset(self.file) as nc:
+            data = nc.variables[self.name][key]
+        return np.ma.filled(np.ma.asarray(data).astype(self.dtype), np.nan)
+
+
+def _read_header(file):
+    import netCDF4
+    import xarray as xr
+
+    with _NETCDF_LOCK, netCDF4.Dataset(file) as nc:
+        time = nc.variables["time"]
+        return {
+            "dimensions": {name: len(dim) for name, dim in nc.dimensions.items()},
+            "variables": sorted(nc.variables),
+            "time": xr.coding.times.decode_cf_datetime(
+                time[:], time.units, getattr(time, "calendar", "standard")
+            ).astype("datetime64[ns]"),
+        }
+
+def _reference_header(index, file):
+    import xarray as xr
+
+    time = index.variable(file, "time")
+    return {
+        "dimensions": index.sizes(file),
+        "variables": sorted(index.dimensions(file)),
+        "time": xr.coding.times.decode_cf_datetime(
+            index.values(file, "time"), time.attrs["units"], time.attrs.get("calendar", "standard")
+        ).astype("datetime64[ns]"),
+    }
+
 def _preprocess(ds):
     ds_out = ds.\
         set_coords(["longitude", "latitude"]).\
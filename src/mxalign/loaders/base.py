@@ -43,6 +43,17 @@ class BaseLoader(ABC):
     def _load(self):
         ...
     
+    def _reference_index(self):
+        """ReferenceIndex from the ``reference_index`` option (a path or a dict of arguments), if any."""
+        config = self.kwargs.get("reference_index", None)
+        if config is None:
+            return None
+        from .reference_index import ReferenceIndex
+
+        if isinstance(config, str):
+            config = {"path": config}
+        return ReferenceIndex(**config)
+
     def _select_variables(self, ds):
         return ds[self.variables]
     
@@ -72,7 +83,13 @@ class MxAlignLoader(BaseLoader):
         import xarray as xr
 
         files = [self.files] if isinstance(self.files, str) else self.files
-        ds = xr.open_mfdataset(files, chunks="auto", **self.kwargs) 
+        index = self._reference_index()
+        if index is not None:
+            index.update(files)
+            ds = index.open_mfdataset(files)
+        else:
+            kwargs = {"chunks": "auto", "parallel": True, **self.kwargs}
+            ds = xr.open_mfdataset(files, **kwargs)
         if "code" in ds.dims:
             ds = ds.rename_dims({"code":"point_index"})
         return ds
@@ -0,0 +1,205 @@
+import base64
+import itertools
+import json
+import math
+import os
+
+import numpy as np
+
+
+class ReferenceIndex():
+    """Persistent kerchunk reference index of a NetCDF4/HDF5 archive.
+
+    For every file the byte ranges of its variable chunks (and the values of
+    small arrays such as coordinates) are stored as kerchunk references in a
+    single JSON manifest. Files are parsed once, when they are first added.
+    Later loads read the manifest and build lazy arrays that read the
+    referenced byte ranges directly, without parsing any HDF5 metadata.
+    Files are identified by their absolute path.
+
+    Args:
+        path (str): Path of the JSON manifest.
+        refresh (bool): Re-index files of which the size or modification
+            time changed. This costs a stat per file, by default indexed files
+            are assumed to be immutable.
+        inline_threshold (int): Arrays smaller than this (in bytes) are stored
+            in the manifest itself.
+    """
+
+    def __init__(self, path, refresh=False, inline_threshold=500):
+        self.path = path
+        self.refresh = refresh
+        self.inline_threshold = inline_threshold
+        self._manifest = None
+
+    def update(self, files):
+        """Index the files that are not in the manifest yet (or changed, with refresh)."""
+        from kerchunk.hdf import SingleHdf5ToZarr
+
+        manifest = self._load()
+        new_files = []
+        for file in files:
+            path = os.path.abspath(file)
+            entry = manifest.get(path, None)
+            if entry is not None and not self.refresh:
+                continue
+            stat = os.stat(path)
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                continue
+            refs = SingleHdf5ToZarr(path, inline_threshold=self.inline_threshold).translate()["refs"]
+            _add_fill_values(path, refs)
+            manifest[path] = {"size": stat.st_size, "mtime": stat.st_mtime, "refs": refs}
+            new_files.append(file)
+        if new_files:
+            print(f"Added {len(new_files)} files to reference index {self.path}")
+            self._save()
+
+    def dimensions(self, file):
+        """Dimension names of every array of a file."""
+        refs = self._refs(file)
+        return {
+            key.rsplit("/", 1)[0]: tuple(_load_json(value)["_ARRAY_DIMENSIONS"])
+            for key, value in refs.items()
+            if key.endswith("/.zattrs")
+        }
+
+    def sizes(self, file):
+        """Size of every dimension of a file."""
+        refs = self._refs(file)
+        sizes = {}
+        for var, dims in self.dimensions(file).items():
+            sizes.update(zip(dims, _load_json(refs[f"{var}/.zarray"])["shape"]))
+        return sizes
+
+    def variable(self, file, var):
+        """Lazy, undecoded xr.Variable of a file, with one dask chunk per stored chunk."""
+        import xarray as xr
+
+        refs = self._refs(file)
+        attrs = dict(_load_json(refs[f"{var}/.zattrs"]))
+        dims = attrs.pop("_ARRAY_DIMENSIONS")
+        zarray = _load_json(refs[f"{var}/.zarray"])
+        if "_FillValue" in attrs:
+            attrs["_FillValue"] = np.array(attrs["_FillValue"], dtype=zarray["dtype"]).item()
+        return xr.Variable(dims, _reference_array(file, var, refs, zarray), attrs)
+
+    def array(self, file, var):
+        """Lazy, CF-decoded dask array of a variable of a file."""
+        import xarray as xr
+
+        return xr.conventions.decode_cf_variable(var, self.variable(file, var)).data
+
+    def values(self, file, var):
+        """Undecoded values of a (small) variable of a file."""
+        return self.variable(file, var).data.compute(scheduler="synchronous")
+
+    def open_dataset(self, file):
+        """The CF-decoded dataset of a file."""
+        import xarray as xr
+
+        variables = {var: self.variable(file, var) for var in self.dimensions(file)}
+        attrs = _load_json(self._refs(file).get(".zattrs", "{}"))
+        return xr.decode_cf(xr.Dataset(variables, attrs=attrs))
+
+    def open_mfdataset(self, files):
+        """Open the files as one dataset, combined by their coordinates like xr.open_mfdataset."""
+        import xarray as xr
+
+        return xr.combine_by_coords([self.open_dataset(file) for file in files], combine_attrs="override")
+
+    def _refs(self, file):
+        return self._load()[os.path.abspath(file)]["refs"]
+
+    def _load(self):
+        if self._manifest is None:
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first, so an interrupted write does not corrupt the index
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._manifest, f, default=_json_default)
+        os.replace(tmp, self.path)
+
+
+def _add_fill_values(file, refs):
+    """Add the _FillValue attribute, which kerchunk strips, to the attributes of the variables that define one.
+
+    The fill value of the zarr array is not enough, as kerchunk falls back to
+    the HDF5 default fill value for datasets without a _FillValue.
+    """
+    import h5py
+
+    with h5py.File(file, "r") as f:
+        for key in list(refs):
+            if not key.endswith("/.zattrs"):
+                continue
+            var = key[:-len("/.zattrs")]
+            if var in f and "_FillValue" in f[var].attrs:
+                attrs = _load_json(refs[key])
+                attrs["_FillValue"] = _load_json(refs[f"{var}/.zarray"])["fill_value"]
+                refs[key] = json.dumps(attrs)
+
+def _reference_array(file, var, refs, zarray):
+    import dask.array as da
+
+    shape = tuple(zarray["shape"])
+    chunk_shape = tuple(zarray["chunks"])
+    dtype = np.dtype(zarray["dtype"])
+    separator = zarray.get("dimension_separator", ".")
+    name = f"reference-{var}-{os.path.abspath(file)}"
+
+    n_chunks = [math.ceil(s / c) for s, c in zip(shape, chunk_shape)]
+    chunks = tuple(
+        tuple(min(c, s - i * c) for i in range(n))
+        for s, c, n in zip(shape, chunk_shape, n_chunks)
+    )
+    graph = {}
+    for index in itertools.product(*(range(n) for n in n_chunks)):
+        key = f"{var}/" + (separator.join(map(str, index)) if index else "0")
+        extent = tuple(chunks[d][i] for d, i in enumerate(index))
+        graph[(name,) + index] = (_read_chunk, refs.get(key, None), zarray, extent)
+    return da.Array(graph, name, chunks=chunks, dtype=dtype, meta=np.empty((0,) * len(shape), dtype=dtype))
+
+def _read_chunk(ref, zarray, extent):
+    """Read and decode one stored chunk, cropped to its extent in the array."""
+    import fsspec
+    import numcodecs
+
+    dtype = np.dtype(zarray["dtype"])
+    if ref is None:
+        return np.full(extent, zarray["fill_value"], dtype=dtype)
+    if isinstance(ref, list):
+        url, offset, size = ref if len(ref) == 3 else (ref[0], 0, None)
+        with fsspec.open(url, "rb") as f:
+            f.seek(offset)
+            buffer = f.read(size) if size is not None else f.read()
+    elif isinstance(ref, str) and ref.startswith("base64:"):
+        buffer = base64.b64decode(ref[len("base64:"):])
+    else:
+        buffer = ref.encode() if isinstance(ref, str) else ref
+
+    if zarray["compressor"] is not None:
+        buffer = numcodecs.get_codec(zarray["compressor"]).decode(buffer)
+    for codec in reversed(zarray["filters"] or []):
+        buffer = numcodecs.get_codec(codec).decode(buffer)
+    data = np.frombuffer(buffer, dtype=dtype).reshape(zarray["chunks"], order=zarray["order"])
+    return data[tuple(slice(0, e) for e in extent)]
+
+def _load_json(value):
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value)} in the reference index")
@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import xarray as xr
 
 from .utils.config import Config
@@ -7,7 +9,11 @@ from .transformations.transform import transform
 from .align.time import align_time
 from .align.space import align_space
 from .utils.save import save_dataset
-from .verification import Metric
+from .interpolations.cache import cache_info
+from .verification import Metric, StreamingMetric
+from .executors import get_executor
+from .incremental import IncrementalStore, IncrementalMetric
+from .utils.dates import to_timedelta64
 
 
 class Runner():
@@ -16,30 +22,59 @@ class Runner():
         self.datasets = {}
     
     def run(self):
+        if self.config["verification"].get("incremental", None):
+            self.run_incremental()
+            return
         self.load_datasets()
         self.transform_datasets()
         self.align()
         self.verify()
 
+    def run_incremental(self):
+        """Only load, align and verify the reference times that are not in the incremental store yet."""
+        config_verify = self.config["verification"]
+        store = IncrementalStore(config_verify["incremental"]["store"])
+        models = [key for key in self.config["datasets"].keys() if key != config_verify["reference"]]
+        processed = store.reference_times(models, list(config_verify["metrics"].keys()))
+        print(f"{len(processed)} reference times already verified")
+        remaining = self.config.exclude_reference_times(processed)
+        if remaining == 0:
+            print("No new reference times, using the stored verification")
+            self.metrics = self._stored_metrics(store, models)
+            return
+        self.load_datasets()
+        self.transform_datasets()
+        self.align()
+        self.verify_incremental(store)
+
     def load_datasets(self):
+        """Load the datasets concurrently, in a pool of ``loading: max_workers`` threads."""
         config_datasets = self.config["datasets"]
-        for key, config in config_datasets.items():
-            config = config.copy()
-            # Check if all the files exist
-            loader = config.pop("loader")
-            variables = config.pop("variables", None)
-            files = []
-            for file in config.pop("files"):
-                if os.path.exists(file):
-                    files.append(file)
-                else: 
-                    print(f"File: {file} is missing, skipping.")
-            self.datasets[key] = load(
-                name=loader,
-                files=files,
-                variables=variables,
-                **config
-            )
+        config_loading = self.config["loading"] or {}
+        with ThreadPoolExecutor(max_workers=config_loading.get("max_workers", None)) as pool:
+            futures = {
+                key: pool.submit(self._load_dataset, config)
+                for key, config in config_datasets.items()
+            }
+            for key, future in futures.items():
+                self.datasets[key] = future.result()
+
+    def _load_dataset(self, config):
+        config = config.copy()
+        loader = config.pop("loader")
+        variables = config.pop("variables", None)
+        # Check if all the files exist
+        files = config.pop("files")
+        exists = existing_files(files)
+        for file in files:
+            if file not in exists:
+                print(f"File: {file} is missing, skipping.")
+        return load(
+            name=loader,
+            files=[file for file in files if file in exists],
+            variables=variables,
+            **config
+        )
     
     def transform_datasets(self):
         config_transformations = self.config["transformations"]
@@ -80,22 +115,73 @@ class Runner():
     def verify(self):
         config_verify = self.config["verification"]
         reference = self.datasets[config_verify["reference"]]
-        metrics = {}
+        config_streaming = config_verify.get("streaming", None)
+        executor = get_executor(config_verify.get("executor", "lazy"))(**config_verify.get("executor_options", {}))
+        tasks = {}
         for metric_name, config in config_verify["metrics"].items():
             config = config.copy()
             func_path = config.pop("function")
             inputs = config.pop("inputs")
-            metric = Metric(
-                name=metric_name,
-                func_path=func_path,
-                ds_ref=reference,
-                inputs=inputs,
-                **config
+            if config_streaming is not None:
+                metric = StreamingMetric(
+                    name=metric_name,
+                    accumulator=config.pop("accumulator", _accumulator_name(func_path)),
+                    ds_ref=reference,
+                    inputs=inputs,
+                    batch_size=config.pop("batch_size", config_streaming.get("batch_size", None)),
+                    **config
+                )
+            else:
+                metric = Metric(
+                    name=metric_name,
+                    func_path=func_path,
+                    ds_ref=reference,
+                    inputs=inputs,
+                    **config
+                )
+            for ds_name, ds in self.datasets.items():
+                if ds_name != config_verify["reference"]:
+                    kwargs = {}
+                    if config_streaming is not None:
+                        kwargs["checkpoint"] = self._checkpoint(config_streaming, ds_name, metric_name)
+                    tasks[(metric_name, ds_name)] = (metric, ds, kwargs)
+
+        results = executor.run(tasks)
+        metrics = {}
+        for (metric_name, ds_name), result in results.items():
+            metrics.setdefault(metric_name, {})[ds_name] = result
+        metrics = {
+            metric_name: xr.concat(
+                models.values(),
+                dim = xr.Variable("model", list(models.keys()))
             )
+            for metric_name, models in metrics.items()
+        }
+        metrics = xr.concat(
+            metrics.values(),
+            dim = xr.Variable("metric", list(metrics.keys()))
+        )
+        self.metrics = metrics.transpose("model", "metric", ...)
+
+    def verify_incremental(self, store):
+        config_verify = self.config["verification"]
+        config_incremental = config_verify["incremental"]
+        reference = self.datasets[config_verify["reference"]]
+        # Recent reference times may not be fully observed yet, they are
+        # verified but only persisted once their longest lead time is
+        # observed, or once they are older than the configured delay
+        delay = config_incremental.get("delay", None)
+        if delay is None:
+            persist_until = last_observed_reference_time(reference)
+        else:
+            persist_until = reference["reference_time"].values.max() - to_timedelta64(delay)
+        metrics = {}
+        for metric_name, config in config_verify["metrics"].items():
+            metric = self._incremental_metric(metric_name, config, store)
             models = {}
             for ds_name, ds in self.datasets.items():
                 if ds_name != config_verify["reference"]:
-                    models[ds_name] = metric.compute(ds)
+                    models[ds_name] = metric.compute(ds_name, ds, reference, persist_until=persist_until)
             models = xr.concat(
                 models.values(),
                 dim = xr.Variable("model", list(models.keys()))
@@ -106,23 +192,101 @@ class Runner():
             dim = xr.Variable("metric", list(metrics.keys()))
         )
         self.metrics = metrics.transpose("model", "metric", ...)
-    
+
+    def _incremental_metric(self, metric_name, config, store):
+        config = config.copy()
+        func_path = config.pop("function")
+        inputs = config.pop("inputs", None)
+        accumulator = config.pop("accumulator", _accumulator_name(func_path))
+        config.setdefault("batch_size", self.config["verification"]["incremental"].get("batch_size", None))
+        return IncrementalMetric(name=metric_name, accumulator=accumulator, store=store, inputs=inputs, **config)
+
+    def _checkpoint(self, config_streaming, ds_name, metric_name):
+        checkpoint_dir = config_streaming.get("checkpoint", None)
+        if checkpoint_dir is None:
+            return None
+        return os.path.join(checkpoint_dir, f"{ds_name}_{metric_name}.zarr")
+
+    def _stored_metrics(self, store, models):
+        config_verify = self.config["verification"]
+        metrics = {}
+        for metric_name, config in config_verify["metrics"].items():
+            metric = self._incremental_metric(metric_name, config, store)
+            metrics[metric_name] = xr.concat(
+                [metric.finalize_stored(model) for model in models],
+                dim = xr.Variable("model", models)
+            )
+        metrics = xr.concat(
+            metrics.values(),
+            dim = xr.Variable("metric", list(metrics.keys()))
+        )
+        return metrics.transpose("model", "metric", ...)
+
     def align_time(self, config):
         self.datasets = align_time(self.datasets, **config)
 
     def align_space(self, reference, config):
         ds_ref = self.datasets[reference]
+        # Group the datasets per alignment type, align_space shares the
+        # interpolator between datasets on the same grid
+        alignments = {}
         for name, ds in self.datasets.items():
             if name != reference:
-                options = config.get(get_spatial_alignment(ds, ds_ref), None)
-                self.datasets[name] = align_space(ds, ds_ref, **options)
+                alignments.setdefault(get_spatial_alignment(ds, ds_ref), {})[name] = ds
+        for alignment, datasets in alignments.items():
+            options = config.get(alignment, None)
+            if options is None:
+                print(f"No options for spatial alignment '{alignment}', skipping {list(datasets.keys())}")
+                continue
+            self.datasets.update(align_space(datasets, ds_ref, **options))
+        info = cache_info()
+        print(
+            f"Interpolation-weight cache: {info['hits']} hits, "
+            f"{info['disk_hits']} disk hits, {info['misses']} misses"
+        )
         
     
+def existing_files(files):
+    """The subset of ``files`` that exist, with one directory listing per directory."""
+    directories = {}
+    for file in files:
+        # Normalise e.g. the trailing slash of directory stores ("store.zarr/")
+        directories.setdefault(os.path.dirname(os.path.normpath(file)), []).append(file)
+    exists = set()
+    for directory, dir_files in directories.items():
+        try:
+            entries = set(os.listdir(directory or "."))
+        except FileNotFoundError:
+            continue
+        except OSError:
+            # e.g. no permission to list the directory, check file by file
+            exists.update(file for file in dir_files if os.path.exists(file))
+            continue
+        exists.update(file for file in dir_files if os.path.basename(os.path.normpath(file)) in entries)
+    return exists
+
+def last_observed_reference_time(reference):
+    """Latest reference time of which the longest lead time is observed, None if there is none."""
+    last_lead = reference.isel(lead_time=int(reference["lead_time"].values.argmax()))
+    observed = last_lead.to_array().notnull()
+    observed = observed.any([dim for dim in observed.dims if dim != "reference_time"]).values
+    if not observed.any():
+        return None
+    return reference["reference_time"].values[observed].max()
+
+def _accumulator_name(func_path):
+    # The accumulator defaults to the name of the metric function, e.g. xskillscore.rmse
+    return func_path.rsplit(".", 1)[-1]
+
 def get_spatial_alignment(ds, reference):
     if reference.space.is_point() and ds.space.is_grid():
         return "interpolation"
     if reference.space.is_grid() and ds.space.is_grid():
         return "regrid"
+    if reference.space.is_point() and ds.space.is_point():
+        return "matching"
+    if reference.space.is_grid() and ds.space.is_point():
+        return "gridding"
     return "null"
 
             
\ No newline at end of file
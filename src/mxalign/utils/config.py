@@ -11,6 +11,8 @@ class Config():
         if not isinstance(self.config, dict):
             raise TypeError("config should be a dictionary.")
         self.dates = self.config.pop("dates", None)
+        self._dates = {}
+        self._files = {}
         self._init_datasets()
     
     def __getitem__(self, key):
@@ -40,5 +42,21 @@ class Config():
             
             if dates:
                 dates = Dates(**dates)
+                self._dates[key] = dates
+                self._files[key] = loader["files"]
                 loader["files"] = dates.substitute(loader["files"])
             self.config["datasets"][key]=loader
+
+    def exclude_reference_times(self, reference_times):
+        """Drop the files of the given reference times from the datasets with dates.
+
+        Returns the number of remaining reference times, or None if no dataset has dates.
+        """
+        if not self._dates:
+            return None
+        remaining = 0
+        for key, dates in self._dates.items():
+            dates = dates.exclude(reference_times)
+            self.config["datasets"][key]["files"] = dates.substitute(self._files[key])
+            remaining = max(remaining, len(dates.reference_times))
+        return remaining
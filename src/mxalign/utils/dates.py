@@ -1,3 +1,5 @@
+import copy
+
 import numpy as np
 from earthkit.data.utils.patterns import Pattern
 
@@ -9,23 +11,38 @@ class Dates:
         self._period = to_timedelta64(period) if isinstance(period, str) else period
         self._range = to_timedelta64(range) if isinstance(range, str) else range
         self._step = to_timedelta64(step) if isinstance(step, str) else step
-        valid_times = set()
-        lead_times = set()
-        reference_times = set()
+        reference_times = []
         date = self._start
         while date <= self._end:
-            reference_times.add(date)
-            delta = np.timedelta64(0,"s")
-            while delta <= self._range:
-                valid_times.add(date + delta)
-                lead_times.add(delta)
-                delta += self._step
+            reference_times.append(date)
             date += self._period
+        self._set_reference_times(reference_times)
+
+    def _set_reference_times(self, reference_times):
+        valid_times = set()
+        lead_times = set()
+        delta = np.timedelta64(0,"s")
+        while delta <= self._range:
+            lead_times.add(delta)
+            delta += self._step
+        for date in reference_times:
+            for delta in lead_times:
+                valid_times.add(date + delta)
         self.valid_times = list(valid_times)
         self.reference_times = list(reference_times)
         # FIXME: can we simplify this? earthkit.data.utils.patterns.Pattern does not accept np.int64
         self.lead_times = sorted([int(t.astype(int)) for t in lead_times])
 
+    def exclude(self, reference_times):
+        """Copy of the dates without the given reference times (and the valid times only they need)."""
+        excluded = np.isin(
+            np.array(self.reference_times, dtype="datetime64[ns]"),
+            np.asarray(reference_times, dtype="datetime64[ns]")
+        )
+        dates = copy.copy(self)
+        dates._set_reference_times([date for date, skip in zip(self.reference_times, excluded) if not skip])
+        return dates
+
     def substitute(self, path: str):
         pattern = Pattern(path)
         paths = pattern.substitute(
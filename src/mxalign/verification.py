@@ -1,4 +1,5 @@
 from .transformations.external import _resolve_function
+from .accumulators import get_accumulator
 from functools import partial
 
 class Metric():
@@ -7,32 +8,76 @@ class Metric():
         func = _resolve_function(func_path)
         self._is_xskillscore = func.__module__.startswith("xskillscore")
         self._dim = kwargs.get("dim", None)
+        self._ds_ref = ds_ref
 
-        kwarg_ref = {}
+        kwarg_ref = []
         kwarg_ds = []
         for input_arg, ds_type in inputs.items():
             if ds_type == "reference":
-                kwarg_ref[input_arg] = self._rechunk(ds_ref) if self._is_xskillscore else ds_ref
+                kwarg_ref.append(input_arg)
             else:
                 kwarg_ds.append(input_arg)
         if len(kwarg_ds) > 1:
             raise ValueError(f"More than one predictor-input argument defined for function {func_path}")
-        partial_kwargs = {**kwarg_ref, **kwargs}
-        self._func = partial(func, **partial_kwargs)
+        self._func = partial(func, **kwargs)
+        self._kwarg_ref = kwarg_ref
         self._kwarg_ds = kwarg_ds[0]
 
-    def compute(self, ds):
-        if self._is_xskillscore:
-            ds = self._rechunk(ds)
-        kwarg_ds = {self._kwarg_ds: ds}
+    def compute(self, ds, rechunked=None):
+        """Apply the metric to ``ds``.
 
-        return self._func(**kwarg_ds)
+        ``rechunked`` is an optional cache of rechunked inputs, shared between
+        metrics so each input is only rechunked once per set of dimensions.
+        """
+        inputs = {input_arg: self._ds_ref for input_arg in self._kwarg_ref}
+        inputs[self._kwarg_ds] = ds
+        if self._is_xskillscore:
+            inputs = {input_arg: self._rechunk(value, rechunked) for input_arg, value in inputs.items()}
+        return self._func(**inputs)
     
-    def _rechunk(self, ds):
+    def _rechunk(self, ds, rechunked=None):
         if self._dim is None:
             return ds
         dim = [self._dim] if isinstance(self._dim, str) else self._dim
-        return ds.chunk({d: -1 for d in dim})
+        if rechunked is None:
+            return ds.chunk({d: -1 for d in dim})
+        # The datasets outlive the cache, so their id is a valid key
+        key = (id(ds), tuple(sorted(dim)))
+        if key not in rechunked:
+            rechunked[key] = ds.chunk({d: -1 for d in dim})
+        return rechunked[key]
+
+
+class StreamingMetric():
+    """Metric computed with an accumulator, streaming the data over time.
+
+    Instead of handing the whole datasets to a function, the partial sums are
+    computed per batch of ``batch_size`` reference times (valid times for
+    observations), so the memory does not depend on the length of the period.
+    The ``inputs`` of the metric function decide the order of the forecast
+    and reference, like for Metric.
+    """
+
+    def __init__(self, name, accumulator, ds_ref, inputs=None, dim=None, batch_size=None, **kwargs):
+        self.name = name
+        self.accumulator = get_accumulator(accumulator)(**kwargs)
+        self._ds_ref = ds_ref
+        self._reference_first = self.accumulator.reference_first(inputs)
+        self._dim = dim
+        self._batch_size = batch_size
+
+    def compute(self, ds, checkpoint=None):
+        over = "reference_time" if "reference_time" in ds.dims else "valid_time"
+        first, second = (self._ds_ref, ds) if self._reference_first else (ds, self._ds_ref)
+        sums = self.accumulator.stream(
+            first,
+            second,
+            dim=self._dim,
+            over=over,
+            batch_size=self._batch_size,
+            checkpoint=checkpoint
+        )
+        return self.accumulator.finalize(sums)
             
 
 # def verify(fcst, obs, func_path, inputs, **kwargs):